@@ -0,0 +1,291 @@
+"""Benchmarks de generación de fixtures, clasificación, exportación (texto, CSV, JSON y Parquet) y pronóstico.
+
+Solo usa la lógica pura (no importa Streamlit):
+
+    python benchmarks/bench.py --output bench.json
+    python benchmarks/bench.py --quick --compare bench_anterior.json
+
+Para cada caso mide el tiempo (mínimo y mediana de varias repeticiones) y
+el pico de memoria (tracemalloc, en una ejecución aparte), y para los
+generadores de fixture también las métricas de calidad de `score_fixture`.
+El resultado es un JSON para poder comparar entre commits.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from collections import Counter
+from functools import partial
+from itertools import cycle
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+import pandas as pd
+
+from model import TournamentModel, ROUND, COURT, P1, P4, SCORE1, SCORE2
+from optimizer import optimize_fixture, score_fixture
+from scheduling import generate_rotation_fixture
+from standings import StandingsAccumulator, STAT_COLUMNS, compute_standings
+from cooccurrence import CooccurrenceIndex
+from forecast import forecast_positions
+from export import EXPORT_FORMATS, export_bytes, history_frame
+from tournament import calculate_standings, generate_simplified_fixture, generate_standings_text
+
+PLAYER_SIZES = (8, 16, 32, 64, 128, 256, 512)
+COURT_SIZES = (1, 2, 4, 8, 16, 32, 64)
+MATCH_SIZES = (10, 100, 1000, 10000)
+QUICK_PLAYER_SIZES = (8, 32, 128)
+QUICK_COURT_SIZES = (1, 4, 16)
+QUICK_MATCH_SIZES = (10, 1000)
+
+
+def measure(func, repeat):
+    """Tiempo (mínimo y mediana) y pico de memoria de `func()`; devuelve también su resultado."""
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - started)
+    tracemalloc.start()
+    value = func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "time_s": {"min": min(times), "median": statistics.median(times), "repeat": repeat},
+        "peak_memory_bytes": peak,
+    }, value
+
+
+def players_for(num_players):
+    return [f"Jugador {i + 1}" for i in range(num_players)]
+
+
+def random_matches(num_matches, num_players, rng):
+    """Matriz de partidos con resultados aleatorios, en el formato de `TournamentModel`."""
+    courts = max(1, min(num_players // 4, 64))
+    matches = np.zeros((num_matches, 8), dtype=np.int32)
+    for row in range(num_matches):
+        matches[row, ROUND] = row // courts + 1
+        matches[row, COURT] = row % courts + 1
+        matches[row, P1:P4 + 1] = rng.sample(range(num_players), 4)
+        matches[row, SCORE1] = rng.randint(0, 7)
+        matches[row, SCORE2] = rng.randint(0, 7)
+    return matches
+
+
+def bench_fixtures(player_sizes, court_sizes, repeat, simplified_max_players, optimizer_budget):
+    generators = {
+        "generate_simplified_fixture": generate_simplified_fixture,
+        "generate_rotation_fixture": generate_rotation_fixture,
+        "optimize_fixture": lambda players, courts: optimize_fixture(players, courts, time_budget=optimizer_budget),
+    }
+    results = []
+    for num_players in player_sizes:
+        players = players_for(num_players)
+        for num_courts in court_sizes:
+            if num_courts > num_players // 4:
+                continue
+            for name, generator in generators.items():
+                # El generador aleatorio es O(N³): a partir de cierto tamaño tarda minutos
+                if name == "generate_simplified_fixture" and num_players > simplified_max_players:
+                    continue
+                if name == "optimize_fixture" and num_players > 64:
+                    continue
+                if name == "generate_simplified_fixture":
+                    run = lambda: generator(players, num_courts, seed=0)
+                else:
+                    run = lambda: generator(players, num_courts)
+                # El optimizador agota siempre su presupuesto: una repetición basta
+                result, fixture = measure(run, 1 if name == "optimize_fixture" else repeat)
+                result.update({
+                    "benchmark": name,
+                    "params": {"players": num_players, "courts": num_courts},
+                    "quality": score_fixture(fixture, players),
+                })
+                results.append(result)
+    return results
+
+
+def next_update_sets(num_matches, rng, count=100):
+    """Ciclo de lotes de `count` resultados en el que cada uno cambia de verdad el marcador.
+
+    La k-ésima vez que se toca una fila en la ejecución t lleva `score1 =
+    (t·veces + k) % 8`: consecutivos para esa fila a lo largo de las
+    ejecuciones, así que `set_score` nunca cae en su salida temprana de
+    "resultado igual al anterior". El valor depende solo de t % 8.
+    """
+    rows = [rng.randrange(num_matches) for _ in range(count)]
+    times = Counter(rows)
+    score2 = [rng.randint(0, 7) for _ in range(count)]
+    update_sets = []
+    for t in range(8):
+        seen = Counter()
+        updates = []
+        for row, s2 in zip(rows, score2):
+            updates.append((row, (t * times[row] + seen[row]) % 8, s2))
+            seen[row] += 1
+        update_sets.append(updates)
+    return cycle(update_sets)
+
+
+def set_score_x100(engine, update_sets):
+    for update in next(update_sets):
+        engine.set_score(*update)
+
+
+def bench_standings(match_sizes, repeat, rng):
+    results = []
+    for num_matches in match_sizes:
+        num_players = max(8, min(512, num_matches // 4))
+        players = players_for(num_players)
+        tournament = TournamentModel(players, random_matches(num_matches, num_players, rng))
+        # calculate_standings lee los resultados de claves como las de la sesión de la app
+        scores = {}
+        for row in range(tournament.num_matches):
+            match_id = tournament.match_id(row)
+            scores[f"score1_{match_id}"], scores[f"score2_{match_id}"] = tournament.score(row)
+        params = {"matches": num_matches, "players": num_players}
+
+        cases = {
+            "calculate_standings": lambda: calculate_standings(players, tournament, scores),
+            "compute_standings": lambda: compute_standings(tournament.matches, num_players),
+            "StandingsAccumulator.__init__": lambda: StandingsAccumulator(tournament),
+        }
+        engine = StandingsAccumulator(tournament)
+        cases["StandingsAccumulator.set_score x100"] = partial(set_score_x100, engine, next_update_sets(num_matches, rng))
+        cases["CooccurrenceIndex.from_model"] = lambda: CooccurrenceIndex.from_model(tournament)
+        index = CooccurrenceIndex.from_model(tournament)
+        cases["CooccurrenceIndex.summary"] = index.summary
+
+        # Lo que hace la pestaña de clasificación para pintar la tabla
+        def standings_dataframe():
+            df = pd.DataFrame(engine.totals[engine.sorted_ids], columns=STAT_COLUMNS)
+            df.insert(0, "Jugador", engine.sorted_players)
+            return df
+        cases["standings_dataframe"] = standings_dataframe
+
+        # Exportación del historial completo en cada formato disponible
+        history = history_frame(players, tournament.matches)
+        for fmt in EXPORT_FORMATS:
+            if fmt != "txt":
+                cases[f"export_history_{fmt}"] = lambda fmt=fmt: export_bytes(history, fmt)
+
+        for name, run in cases.items():
+            result, _ = measure(run, repeat)
+            result.update({"benchmark": name, "params": params})
+            results.append(result)
+    return results
+
+
+def bench_text(player_sizes, repeat, rng):
+    results = []
+    for num_players in player_sizes:
+        players = players_for(num_players)
+        tournament = TournamentModel(players, random_matches(num_players * 4, num_players, rng))
+        engine = StandingsAccumulator(tournament)
+        standings, sorted_players = engine.standings, engine.sorted_players
+        result, _ = measure(lambda: generate_standings_text(standings, sorted_players, "Benchmark"), repeat)
+        result.update({"benchmark": "generate_standings_text", "params": {"players": num_players}})
+        results.append(result)
+    return results
+
+
+def bench_forecast(player_sizes, repeat, rng):
+    """Pronóstico Monte Carlo con la mitad del fixture de rotación jugado."""
+    results = []
+    for num_players in player_sizes:
+        players = players_for(num_players)
+        num_courts = num_players // 4
+        tournament = TournamentModel.from_fixture(players, generate_rotation_fixture(players, num_courts))
+        played = tournament.num_matches // 2
+        for row in range(played):
+            tournament.set_score(row, rng.randint(0, 6), 6)
+        result, _ = measure(lambda: forecast_positions(tournament.matches, num_players, seed=0), repeat)
+        result.update({
+            "benchmark": "forecast_positions",
+            "params": {"players": num_players, "pending_matches": tournament.num_matches - played, "simulations": 20000},
+        })
+        results.append(result)
+    return results
+
+
+def metadata():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def case_key(result):
+    return result["benchmark"] + json.dumps(result["params"], sort_keys=True)
+
+
+def compare(current, previous):
+    """Imprime el cociente de tiempos (actual / anterior) de los casos comunes."""
+    previous_times = {case_key(r): r["time_s"]["min"] for r in previous["results"]}
+    print(f"{'caso':<70} {'antes (s)':>12} {'ahora (s)':>12} {'ratio':>8}")
+    for result in current["results"]:
+        before = previous_times.get(case_key(result))
+        if before is None:
+            continue
+        now = result["time_s"]["min"]
+        ratio = now / before if before > 0 else float("inf")
+        label = f"{result['benchmark']} {result['params']}"
+        print(f"{label:<70} {before:>12.6f} {now:>12.6f} {ratio:>8.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks del gestor de torneos americanos")
+    parser.add_argument("--output", default="bench_output.json", help="Fichero JSON de resultados")
+    parser.add_argument("--quick", action="store_true", help="Solo un subconjunto de tamaños")
+    parser.add_argument("--repeat", type=int, default=3, help="Repeticiones por caso")
+    parser.add_argument("--simplified-max-players", type=int, default=128,
+                        help="Tamaño máximo para generate_simplified_fixture (es O(N³))")
+    parser.add_argument("--optimizer-budget", type=float, default=0.5, help="Presupuesto del optimizador (s)")
+    parser.add_argument("--compare", help="JSON de una ejecución anterior con el que comparar tiempos")
+    args = parser.parse_args(argv)
+
+    player_sizes = QUICK_PLAYER_SIZES if args.quick else PLAYER_SIZES
+    court_sizes = QUICK_COURT_SIZES if args.quick else COURT_SIZES
+    match_sizes = QUICK_MATCH_SIZES if args.quick else MATCH_SIZES
+
+    rng = random.Random(0)
+    results = []
+    results += bench_fixtures(player_sizes, court_sizes, args.repeat,
+                              args.simplified_max_players, args.optimizer_budget)
+    results += bench_standings(match_sizes, args.repeat, rng)
+    results += bench_text(player_sizes, args.repeat, rng)
+    results += bench_forecast([n for n in player_sizes if n <= 64], args.repeat, rng)
+
+    report = {"meta": metadata(), "results": results}
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"{len(results)} casos guardados en {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(report, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""Simulación de árbitros enviando resultados a la vez contra `score_server.py`.
+
+    python benchmarks/referee_sim.py --players 64 --courts 16 --referees 200
+
+Crea un torneo en una base de datos temporal, arranca la API en local y
+lanza `--referees` clientes asíncronos (una conexión keep-alive cada uno)
+que leen la versión de un partido y envían su resultado. Una parte de los
+envíos se hace a propósito sobre el mismo partido, para provocar
+conflictos de versión. Al final comprueba que la clasificación servida por
+la API coincide con la calculada desde cero con los datos de la base de
+datos e imprime el rendimiento y el número de conflictos.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from export import standings_frame
+from model import TournamentModel, ROUND, COURT, SCORE1, NO_SCORE
+from score_server import ScoreServer
+from scheduling import generate_rotation_fixture
+from standings import STAT_COLUMNS, compute_standings
+from storage import TournamentStore
+
+
+async def request(reader, writer, method, path, payload=None):
+    body = b"" if payload is None else json.dumps(payload).encode("utf-8")
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n"
+        f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n".encode("latin-1") + body
+    )
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length)) if length else None
+
+
+async def referee(port, tournament_id, assignments, counts, latencies):
+    """Un árbitro: para cada partido asignado lee su versión y envía el resultado."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        for round_num, court in assignments:
+            status, data = await request(reader, writer, "GET", f"/tournaments/{tournament_id}/matches?round={round_num}")
+            match = next(m for m in data["matches"] if m["court"] == court)
+            score1 = random.randint(0, 6)
+            score2 = 6 if score1 < 6 else random.randint(0, 5)
+            started = time.perf_counter()
+            status, _ = await request(reader, writer, "POST", f"/tournaments/{tournament_id}/scores", {
+                "round": round_num, "court": court, "score1": score1, "score2": score2, "version": match["version"],
+            })
+            latencies.append(time.perf_counter() - started)
+            counts[status] = counts.get(status, 0) + 1
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+
+async def simulate(args, db_path):
+    players = [f"Jugador {i + 1}" for i in range(args.players)]
+    model = TournamentModel.from_fixture(players, generate_rotation_fixture(players, args.courts, seed=args.seed))
+    store = TournamentStore(db_path)
+    tournament_id = store.create_tournament({"name": "Simulación"}, model)
+
+    server = ScoreServer(store, batch_interval=args.batch_interval)
+    http = await server.start("127.0.0.1", 0)
+    port = http.sockets[0].getsockname()[1]
+
+    # Cada partido se reparte a un árbitro; un porcentaje se reparte además a otro (conflicto)
+    matches = [(int(r), int(c)) for r, c in model.matches[:, [ROUND, COURT]]]
+    assignments = [[] for _ in range(args.referees)]
+    for match in matches:
+        chosen = random.sample(range(args.referees), 2 if random.random() < args.conflict_rate else 1)
+        for i in chosen:
+            assignments[i].append(match)
+
+    counts, latencies = {}, []
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        referee(port, tournament_id, a, counts, latencies) for a in assignments if a
+    ))
+    elapsed = time.perf_counter() - started
+
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    _, served = await request(reader, writer, "GET", f"/tournaments/{tournament_id}/standings")
+    writer.close()
+    await writer.wait_closed()
+    http.close()
+    await http.wait_closed()
+    server.close()
+
+    # Referencia: clasificación calculada desde cero con lo que quedó en la base de datos
+    saved = TournamentStore(db_path).load_tournament(tournament_id)
+    totals, ranking = compute_standings(saved.matches, len(players))
+    expected = json.loads(standings_frame(totals, ranking, players, STAT_COLUMNS).to_json(orient="records", force_ascii=False))
+
+    latencies.sort()
+    submissions = sum(counts.values())
+    return {
+        "players": args.players,
+        "matches": len(matches),
+        "referees": args.referees,
+        "submissions": submissions,
+        "accepted": counts.get(200, 0),
+        "conflicts": counts.get(409, 0),
+        "other": {k: v for k, v in counts.items() if k not in (200, 409)},
+        "batches": server.batches,
+        "seconds": round(elapsed, 3),
+        "submissions_per_s": round(submissions / elapsed, 1),
+        "latency_p50_ms": round(latencies[len(latencies) // 2] * 1000, 2),
+        "latency_p95_ms": round(latencies[int(0.95 * (len(latencies) - 1))] * 1000, 2),
+        "standings_match": served["standings"] == expected,
+        "all_scored": bool((saved.matches[:, SCORE1:] != NO_SCORE).all()),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simula árbitros concurrentes contra la API de resultados")
+    parser.add_argument("--players", type=int, default=64)
+    parser.add_argument("--courts", type=int, default=16)
+    parser.add_argument("--referees", type=int, default=200)
+    parser.add_argument("--conflict-rate", type=float, default=0.1, help="Fracción de partidos enviados por dos árbitros")
+    parser.add_argument("--batch-interval", type=float, default=0.02)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    random.seed(args.seed)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        result = asyncio.run(simulate(args, os.path.join(tmp, "sim.db")))
+    print(json.dumps(result, indent=2))
+    if not (result["standings_match"] and result["all_scored"]):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""CLI por lotes: fixtures y clasificaciones de muchos torneos sin Streamlit.
+
+    python cli.py torneos/ --output resultados.jsonl --text-dir clasificaciones/
+
+Entradas (ficheros o directorios, que se recorren en orden):
+
+* `.json`: un torneo `{"name", "players", "num_courts", "algorithm", "seed", "results"}`.
+* `.jsonl`: un torneo por línea, con el mismo formato.
+* `.csv`: la plantilla, un jugador por fila (columna `player` o `jugador`, o
+  la primera columna). El nombre del torneo es el del fichero y las pistas y
+  el algoritmo se toman de las opciones de la línea de comandos.
+
+`results` es opcional: lista de `{"round", "court", "score1", "score2"}`.
+Con el algoritmo `optimizado` se puede indicar `candidates` (candidatos que evalúa).
+
+Los torneos se leen de uno en uno y se procesan en un pool de procesos con
+un número acotado de tareas en vuelo; cada resultado se escribe en cuanto
+termina (una línea JSON por torneo), así que la memoria no crece con el
+número de torneos.
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import pandas as pd
+
+from model import TournamentModel
+from optimizer import SEEDED_CANDIDATES, optimize_fixture
+from scheduling import generate_rotation_fixture
+from score_import import IMPORT_COLUMNS, validate_scores
+from standings import STAT_COLUMNS, compute_standings
+from tournament import generate_simplified_fixture, generate_standings_text
+
+ALGORITHMS = {
+    "rotacion": generate_rotation_fixture,
+    "optimizado": optimize_fixture,
+    "aleatorio": generate_simplified_fixture,
+}
+
+
+def iter_input_files(paths):
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if os.path.splitext(name)[1].lower() in (".json", ".jsonl", ".csv"):
+                    yield os.path.join(path, name)
+        else:
+            yield path
+
+
+def read_csv_roster(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    if not rows:
+        return []
+    header = [h.strip().lower() for h in rows[0]]
+    for column in ("player", "jugador"):
+        if column in header:
+            idx = header.index(column)
+            return [row[idx].strip() for row in rows[1:] if len(row) > idx and row[idx].strip()]
+    return [row[0].strip() for row in rows if row and row[0].strip()]
+
+
+def _make_spec(defaults, name, source, read):
+    """Combina los valores por defecto con los del fichero; un fichero ilegible no detiene el lote."""
+    spec = dict(defaults, name=name, source=source)
+    try:
+        spec.update(read())
+    except (OSError, ValueError) as exc:
+        spec["invalid"] = f"{type(exc).__name__}: {exc}"
+    spec["source"] = source
+    return spec
+
+
+def iter_tournaments(paths, defaults):
+    """Genera las especificaciones de torneo de una en una (sin cargar todas en memoria)."""
+    for path in iter_input_files(paths):
+        ext = os.path.splitext(path)[1].lower()
+        name = os.path.splitext(os.path.basename(path))[0]
+        if ext == ".csv":
+            yield _make_spec(defaults, name, path, lambda: {"players": read_csv_roster(path)})
+        elif ext == ".jsonl":
+            with open(path, encoding="utf-8") as f:
+                for line_num, line in enumerate(f, start=1):
+                    if line.strip():
+                        yield _make_spec(defaults, f"{name}-{line_num}", f"{path}:{line_num}", lambda: json.loads(line))
+        else:
+            def read_json():
+                with open(path, encoding="utf-8") as f:
+                    return json.load(f)
+            yield _make_spec(defaults, name, path, read_json)
+
+
+def process_tournament(spec):
+    """Genera el fixture, aplica los resultados conocidos y calcula la clasificación de un torneo."""
+    try:
+        if "invalid" in spec:
+            raise ValueError(spec["invalid"])
+        players = spec["players"]
+        if len(set(players)) != len(players):
+            raise ValueError("Hay nombres de jugador duplicados")
+        generator = ALGORITHMS[spec["algorithm"]]
+        # Cada torneo ya ocupa un proceso del pool: el optimizador no abre otro
+        params = {"workers": 1, "candidates": spec.get("candidates", SEEDED_CANDIDATES)} if generator is optimize_fixture else {}
+        fixture = generator(players, spec["num_courts"], spec.get("num_rounds"), seed=spec.get("seed"), **params)
+        tournament = TournamentModel.from_fixture(players, fixture)
+        if not tournament.num_matches:
+            raise ValueError("No se pudo generar ningún partido con esta configuración")
+
+        results = pd.DataFrame(spec.get("results", []), columns=list(IMPORT_COLUMNS))
+        rows, scores, errors = validate_scores(tournament, results)
+        if len(errors):
+            raise ValueError(f"Resultados no válidos: {errors.to_dict('records')}")
+        tournament.set_scores(rows, scores)
+
+        totals, order = compute_standings(tournament.matches, len(players))
+        standings = {p: dict(zip(STAT_COLUMNS, (int(v) for v in totals[i]))) for i, p in enumerate(players)}
+        sorted_players = [players[i] for i in order]
+        return {
+            "name": spec["name"],
+            "source": spec.get("source"),
+            "fixture": tournament.to_fixture(),
+            "standings": [dict(Pos=pos + 1, Jugador=p, **standings[p]) for pos, p in enumerate(sorted_players)],
+            "text": generate_standings_text(standings, sorted_players, spec["name"]),
+        }
+    except (KeyError, ValueError, TypeError) as exc:
+        return {"name": spec.get("name"), "source": spec.get("source"), "error": f"{type(exc).__name__}: {exc}"}
+
+
+def run(specs, output, workers, text_dir=None, max_in_flight=None):
+    """Procesa las especificaciones con un pool y escribe cada resultado en cuanto está listo."""
+    max_in_flight = max_in_flight or workers * 2
+    processed = failed = 0
+
+    def write(result):
+        nonlocal processed, failed
+        processed += 1
+        if "error" in result:
+            failed += 1
+            print(f"Error en {result['source']}: {result['error']}", file=sys.stderr)
+        elif text_dir:
+            file_name = str(result['name']).replace(os.sep, "_")
+            with open(os.path.join(text_dir, f"{file_name}.txt"), "w", encoding="utf-8") as f:
+                f.write(result.pop("text"))
+        output.write(json.dumps(result, ensure_ascii=False) + "\n")
+        output.flush()
+
+    if workers == 1:
+        for spec in specs:
+            write(process_tournament(spec))
+        return processed, failed
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        in_flight = set()
+        for spec in specs:
+            # Ventana acotada: no se lee el siguiente torneo hasta que haya hueco
+            if len(in_flight) >= max_in_flight:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    write(future.result())
+            in_flight.add(pool.submit(process_tournament, spec))
+        for future in wait(in_flight).done:
+            write(future.result())
+    return processed, failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera fixtures y clasificaciones de torneos americanos por lotes")
+    parser.add_argument("inputs", nargs="+", help="Ficheros .json/.jsonl/.csv o directorios")
+    parser.add_argument("--output", default="-", help="Fichero JSON Lines de salida ('-' = salida estándar)")
+    parser.add_argument("--text-dir", help="Directorio donde guardar la clasificación en texto de cada torneo")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Procesos en paralelo")
+    parser.add_argument("--courts", type=int, default=2, help="Pistas por defecto")
+    parser.add_argument("--algorithm", choices=sorted(ALGORITHMS), default="rotacion", help="Algoritmo por defecto")
+    parser.add_argument("--seed", type=int, default=0, help="Semilla por defecto")
+    args = parser.parse_args(argv)
+
+    if args.text_dir:
+        os.makedirs(args.text_dir, exist_ok=True)
+    defaults = {"num_courts": args.courts, "algorithm": args.algorithm, "seed": args.seed}
+    specs = iter_tournaments(args.inputs, defaults)
+
+    if args.output == "-":
+        processed, failed = run(specs, sys.stdout, args.workers, args.text_dir)
+    else:
+        with open(args.output, "w", encoding="utf-8") as output:
+            processed, failed = run(specs, output, args.workers, args.text_dir)
+    print(f"{processed} torneos procesados, {failed} con errores", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,212 +1,489 @@
- import streamlit as st
+import streamlit as st
 import pandas as pd
-import random
-from itertools import combinations
+import altair as alt
+import numpy as np
 import math
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+
+from scheduling import generate_rotation_fixture, generate_mexicano_fixture, mexicano_round
+from optimizer import SEEDED_CANDIDATES, optimize_fixture, score_fixture
+from tournament import generate_simplified_fixture
+from standings import StandingsAccumulator, STAT_COLUMNS, DEFAULT_RANKING, match_id_for, rank_players
+from model import TournamentModel, COURT, SCORE1, SCORE2, NO_SCORE, MAX_SCORE
+from storage import TournamentStore, ScoreWriteBuffer
+from fixture_cache import FixtureCache
+from score_import import read_score_table, validate_scores
+from export import EXPORT_FORMATS, ExportCache, export_bytes, history_frame, standings_frame
+from cooccurrence import CooccurrenceIndex
+from forecast import forecast_positions
+from instrumentation import Profiler, instrumented, set_profiler_lookup, timed
+
+# --- Funciones de la Interfaz (la lógica pura del torneo está en tournament.py) ---
+
+def get_session_profiler():
+    """Profiler de la sesión, solo si la instrumentación está activada en el panel de administración."""
+    if not st.session_state.get('instrumentation_enabled'):
+        return None
+    return st.session_state.get('profiler')
+
+set_profiler_lookup(get_session_profiler)
+
+def get_standings_engine():
+    """Devuelve el acumulador de clasificación de la sesión, creándolo desde los resultados del modelo si no existe."""
+    if st.session_state.get('standings_engine') is None:
+        with timed("StandingsAccumulator"):
+            st.session_state.standings_engine = StandingsAccumulator(st.session_state.tournament)
+        # Las exportaciones cacheadas dependen de la versión de este acumulador
+        st.session_state.export_cache = ExportCache()
+    return st.session_state.standings_engine
+
+@instrumented()
+def get_cooccurrence_index():
+    """Índice de compañeros, rivales y descansos de la sesión; solo cuenta las rondas añadidas desde la última llamada."""
+    tournament = st.session_state.tournament
+    if st.session_state.get('cooccurrence') is None:
+        st.session_state.cooccurrence = CooccurrenceIndex(len(tournament.players))
+    with timed("CooccurrenceIndex.sync"):
+        st.session_state.cooccurrence.sync(tournament)
+    return st.session_state.cooccurrence
+
+@instrumented()
+def record_score(row, score1, score2):
+    """Aplica un resultado al modelo y a la clasificación, y lo deja pendiente de guardar."""
+    get_standings_engine().set_score(row, score1, score2)
+    st.session_state.score_buffer.add(row, score1, score2)
+
+@instrumented()
+def flush_pending_scores():
+    """Guarda de una vez en la base de datos los resultados cambiados desde el último guardado."""
+    st.session_state.score_buffer.flush(get_store(), st.session_state.tournament_id)
+
+def on_score_change(row, match_id):
+    """Callback de los inputs de resultado: aplica solo el cambio de ese partido."""
+    record_score(row, st.session_state.get(f"score1_{match_id}"), st.session_state.get(f"score2_{match_id}"))
+
+def on_round_editor_change(round_num):
+    """Callback de la tabla editable de una ronda: aplica las celdas de resultado modificadas."""
+    tournament = st.session_state.tournament
+    rows = tournament.round_rows(round_num)
+    for position, changes in st.session_state[f"editor_r{round_num}"]["edited_rows"].items():
+        row = rows[int(position)]
+        score1, score2 = tournament.score(row)
+        score1 = changes.get("Games 1", score1)
+        score2 = changes.get("Games 2", score2)
+        record_score(
+            row,
+            None if pd.isna(score1) else score1,
+            None if pd.isna(score2) else score2
+        )
 
-# --- Funciones Lógicas del Torneo (Adaptadas de la versión de consola) ---
-
-def generate_simplified_fixture(players, num_courts):
-    """Genera un fixture SIMPLIFICADO. No garantiza rotación perfecta."""
-    num_players = len(players)
-    if num_players < 4:
-        return {"rounds": []} # No se puede jugar con menos de 4
-
-    # Número de rondas tentativo (N-1 es para Round Robin completo, adaptamos)
-    # Para un americano, puede ser menos, depende de cuánto tiempo se tenga.
-    # Usemos una heurística: suficientes rondas para que la gente juegue varias veces.
-    # Podríamos hacerlo configurable, pero empecemos con N/2 o N-1
-    # num_rounds = max(1, num_players // 2) # Ejemplo: jugar aprox la mitad de rondas posibles
-    num_rounds = max(1, num_players - 1) # Más cercano al americano completo
+def render_export_buttons(label, kind, make_df, version, formats, file_stem):
+    """Botones de descarga de una tabla. El fichero se genera al pulsar (en diferido) y se
+    reutiliza mientras no cambie `version`."""
+    cache = st.session_state.export_cache
+    tournament_name = st.session_state.config.get('name', 'Torneo')
+    columns = st.columns(len(formats))
+    for column, fmt in zip(columns, formats):
+        fmt_label, extension, mime, _ = EXPORT_FORMATS[fmt]
+        column.download_button(
+            label=f"{label} ({fmt_label})",
+            # `make_df` trabaja sobre una instantánea de este rerun: la descarga no ve cambios posteriores
+            data=lambda fmt=fmt: cache.get_or_build((kind, fmt), version, lambda: export_bytes(make_df(), fmt, tournament_name)),
+            file_name=f"{file_stem}.{extension}",
+            mime=mime,
+            key=f"download_{kind}_{fmt}",
+            use_container_width=True
+        )
 
-    fixture = {"rounds": []}
-    all_players = list(players) # Copia para manipular
+@instrumented()
+def on_import_scores():
+    """Callback de la importación masiva: valida la tabla entera y, si no hay errores, la aplica como un lote."""
+    uploaded = st.session_state.get('import_file')
+    text = uploaded.getvalue().decode("utf-8-sig") if uploaded is not None else st.session_state.get('import_text', "")
+    tournament = st.session_state.tournament
+    try:
+        rows, scores, errors = validate_scores(tournament, read_score_table(text))
+    except ValueError as exc:
+        st.session_state.import_report = {"error": str(exc)}
+        return
+    if len(errors):
+        # No se importa nada hasta que la tabla esté limpia
+        st.session_state.import_report = {"errors": errors}
+        return
+    # Una sola actualización de la clasificación y una sola transacción para todo el lote
+    get_standings_engine().set_scores(rows, scores)
+    for row, (score1, score2) in zip(rows.tolist(), scores.tolist()):
+        st.session_state.score_buffer.add(row, score1, score2)
+    flush_pending_scores()
+    # Las tablas editables guardan sus cambios relativos a los datos anteriores
+    for key in [k for k in st.session_state.keys() if k.startswith('editor_r')]:
+        del st.session_state[key]
+    st.session_state.import_report = {"imported": len(rows)}
+
+@instrumented()
+def sync_remote_scores():
+    """Aplica los resultados guardados por otros procesos (API de árbitros, otras sesiones).
+
+    Solo consulta el contador de cambios del torneo; si ha avanzado, lee los
+    partidos cambiados y aplica como un lote los que difieren del modelo.
+    Devuelve True si ha cambiado algo.
+    """
+    store = get_store()
+    tournament_id = st.session_state.tournament_id
+    version = store.score_version(tournament_id)
+    synced = st.session_state.get('synced_version', 0)
+    if version == synced:
+        return False
+    rows, matches, _ = store.changes_since(tournament_id, synced)
+    st.session_state.synced_version = version
+    tournament = st.session_state.tournament
+    if len(rows) and rows.max() >= tournament.num_matches:
+        # Otra sesión ha añadido una ronda (Mexicano): se recarga el torneo entero
+        selected_round = st.session_state.get('selected_round')
+        resume_tournament(tournament_id)
+        st.session_state.selected_round = selected_round
+        changed = True
+    else:
+        # Los cambios propios de esta sesión ya están en el modelo y se descartan aquí
+        scores = matches[:, SCORE1:SCORE2 + 1]
+        differs = (tournament.matches[rows, SCORE1:SCORE2 + 1] != scores).any(axis=1)
+        changed = bool(differs.any())
+        if changed:
+            get_standings_engine().set_scores(rows[differs], scores[differs])
+    if changed:
+        for key in [k for k in st.session_state.keys() if k.startswith('editor_r')]:
+            del st.session_state[key]
+    return changed
+
+@st.fragment(run_every=2)
+def poll_live_scores():
+    """Comprueba cada 2 s si han llegado resultados nuevos y, si es así, vuelve a pintar la app."""
+    if sync_remote_scores():
+        st.rerun(scope="app")
+    st.caption(f"📡 Recibiendo resultados en vivo (cambio #{st.session_state.synced_version} del torneo)")
+
+def request_sample_profile():
+    """Callback del panel de administración: perfila por muestreo el rerun que provoca el clic."""
+    st.session_state.profiler.sample_next = True
+
+def render_admin_panel(profiler):
+    """Panel oculto de rendimiento (se muestra con `?admin=1` o `PADEL_ADMIN=1`)."""
+    with st.sidebar.expander("🛠️ Rendimiento (admin)", expanded=True):
+        enabled = st.toggle("Activar instrumentación", key='instrumentation_enabled')
+        if not enabled:
+            st.caption("Con la instrumentación activada se mide cada rerun, las funciones principales y el tamaño de la sesión.")
+            return
+        st.button("🔬 Perfilar el próximo rerun (muestreo)", on_click=request_sample_profile)
+
+        summary = profiler.rerun_summary()
+        if summary:
+            r1, r2, r3 = st.columns(3)
+            r1.metric("Último rerun", f"{summary['last_s'] * 1000:.0f} ms")
+            r2.metric("Media", f"{summary['mean_s'] * 1000:.0f} ms")
+            r3.metric("p95", f"{summary['p95_s'] * 1000:.0f} ms")
+            st.caption(f"{summary['count']} reruns medidos (máximo {summary['max_s'] * 1000:.0f} ms)")
+        functions = profiler.function_rows()
+        if functions:
+            st.dataframe(pd.DataFrame(functions).round(2), hide_index=True, use_container_width=True)
+        if profiler.session_size:
+            st.caption(
+                f"Sesión: {profiler.session_size['keys']} claves, "
+                f"{profiler.session_size['bytes'] / 1024:.1f} KiB (serializado)"
+            )
+            st.dataframe(
+                pd.DataFrame(list(profiler.session_size['per_key'].items()), columns=["Clave", "Bytes"]).head(15),
+                hide_index=True, use_container_width=True
+            )
+        if profiler.sample:
+            st.caption(f"Perfil por muestreo: {profiler.sample['samples']} muestras cada {profiler.sample['interval_s'] * 1000:.0f} ms")
+            st.dataframe(pd.DataFrame(profiler.sample['cumulative'], columns=["Función", "Muestras (acumuladas)"]),
+                         hide_index=True, use_container_width=True)
+
+        col_download, col_reset = st.columns(2)
+        col_download.download_button("⬇️ Exportar JSON", data=profiler.to_json, file_name="rendimiento.json",
+                                     mime="application/json")
+        col_reset.button("Reiniciar medidas", on_click=profiler.reset)
+
+@instrumented()
+def generate_next_round():
+    """Callback del formato Mexicano: genera la ronda siguiente con la clasificación actual."""
+    tournament = st.session_state.tournament
+    last_rows = tournament.round_rows(tournament.round_numbers[-1])
+    if (tournament.matches[last_rows.start:last_rows.stop, SCORE1:SCORE2 + 1] == NO_SCORE).any():
+        st.session_state.next_round_error = f"Faltan resultados de la ronda {tournament.round_numbers[-1]}."
+        return
+    engine = get_standings_engine()
+    index = get_cooccurrence_index()
+    round_num = tournament.round_numbers[-1] + 1
+    # Mismo orden que la tabla de clasificación (PG, DG, JG), mantenido de forma incremental;
+    # el índice evita repetir compañeros dentro de cada grupo de cuatro
+    matches, _ = mexicano_round(engine.sorted_ids, index.games, st.session_state.config['num_courts'], round_num, index)
+    new_rows = tournament.append_round(round_num, matches)
+    try:
+        get_store().append_matches(st.session_state.tournament_id, tournament, new_rows)
+    except sqlite3.IntegrityError:
+        # Otra sesión ha guardado antes esta ronda: se descarta la propia y se recarga la guardada
+        resume_tournament(st.session_state.tournament_id)
+        st.session_state.next_round_error = f"Otra sesión ya había generado la ronda {round_num}; se muestra esa."
+    st.session_state.selected_round = round_num
+
+def render_cooccurrence_heatmap(matrix, players, label):
+    """Mapa de calor de una matriz N×N de coincidencias (imagen en escala de grises con muchos jugadores)."""
+    if len(players) > 64:
+        # Con cientos de jugadores un gráfico con N² celdas es inmanejable: se pinta como imagen
+        scale = max(int(matrix.max()), 1)
+        st.image((255 - matrix.astype(np.int64) * 255 // scale).astype(np.uint8), caption=f"{label} (más oscuro = más veces, máximo {scale})", clamp=True)
+        return
+    names = np.asarray(players, dtype=object)
+    rows, cols = np.indices(matrix.shape)
+    df_matrix = pd.DataFrame({"Jugador": names[rows.ravel()], "Con": names[cols.ravel()], "Veces": matrix.ravel()})
+    chart = alt.Chart(df_matrix).mark_rect().encode(
+        x=alt.X("Con:N", sort=list(players), title=None),
+        y=alt.Y("Jugador:N", sort=list(players), title=None),
+        color=alt.Color("Veces:Q", title=label),
+        tooltip=["Jugador", "Con", "Veces"]
+    )
+    st.altair_chart(chart, use_container_width=True)
+
+@instrumented()
+def render_fairness(tournament):
+    """Pestaña de equidad: repeticiones de compañeros y rivales, partidos y descansos por jugador."""
+    index = get_cooccurrence_index()
+    summary = index.summary()
+    f1, f2, f3, f4 = st.columns(4)
+    f1.metric("Parejas repetidas", summary['repeated_partners'], help=f"Máximo de veces con el mismo compañero: {summary['max_partner_count']}")
+    f2.metric("Rivales repetidos", summary['repeated_opponents'], help=f"Máximo de veces contra el mismo rival: {summary['max_opponent_count']}")
+    f3.metric("Partidos por jugador", f"{summary['games_min']}–{summary['games_max']}")
+    f4.metric("Descansos por jugador", f"{summary['rests_min']}–{summary['rests_max']}")
+    st.caption(
+        f"{summary['never_partnered']} parejas posibles aún no han jugado juntas y "
+        f"{summary['never_opposed']} aún no se han enfrentado ({index.rounds} rondas)."
+    )
 
-    # --- Lógica de generación de rondas (Simplificada) ---
-    # Esta parte sigue siendo compleja para garantizar justicia y no repetición.
-    # Usaremos una aleatorización fuerte en cada ronda como aproximación.
-    
-    # Historial para minimizar repetición de parejas (simple)
-    played_pairs = set() 
-    
-    for round_num in range(1, num_rounds + 1):
-        round_matches = []
-        players_this_round = list(all_players)
-        random.shuffle(players_this_round)
+    matrix_label = st.radio("Matriz", ["Compañeros", "Rivales"], horizontal=True, key='fairness_matrix')
+    render_cooccurrence_heatmap(index.partners if matrix_label == "Compañeros" else index.opponents, tournament.players, matrix_label)
+    st.bar_chart(pd.DataFrame({"Partidos": index.games, "Descansos": index.rests}, index=tournament.players))
+
+@instrumented()
+def get_fixture_quality(tournament):
+    """Calidad del fixture; solo se recalcula si cambia el fixture (otro torneo o una ronda nueva)."""
+    version = (st.session_state.tournament_id, tournament.num_matches)
+    cached = st.session_state.get('fixture_quality')
+    if cached is None or cached[0] != version:
+        with timed("score_fixture"):
+            st.session_state.fixture_quality = cached = (version, score_fixture(tournament.to_fixture(), tournament.players))
+    return cached[1]
+
+@instrumented()
+def get_forecast(tournament, engine):
+    """Pronóstico de la clasificación final; solo se recalcula si ha cambiado algún resultado o el fixture."""
+    version = (engine.version, tournament.num_matches)
+    cached = st.session_state.get('forecast')
+    if cached is None or cached[0] != version:
+        result = forecast_positions(tournament.matches, len(tournament.players), seed=FORECAST_SEED,
+                                    executor=get_forecast_pool())
+        st.session_state.forecast = cached = (version, result)
+    return cached[1]
+
+def render_forecast(tournament, engine, ranking_ids):
+    """Probabilidad de ganar, de podio y de cada posición final, según los partidos que faltan."""
+    forecast = get_forecast(tournament, engine)
+    probabilities = forecast['probabilities'][ranking_ids]
+    df_forecast = pd.DataFrame({
+        "Jugador": [tournament.players[i] for i in ranking_ids],
+        "Gana": probabilities[:, 0],
+        "Podio": probabilities[:, :3].sum(axis=1),
+        "Pos. esperada": forecast['expected_position'][ranking_ids],
+        "Pos. más probable": probabilities.argmax(axis=1) + 1,
+    })
+    st.dataframe(
+        df_forecast,
+        hide_index=True,
+        use_container_width=True,
+        column_config={
+            "Gana": st.column_config.ProgressColumn("Gana", format="percent", min_value=0, max_value=1),
+            "Podio": st.column_config.ProgressColumn("Podio", format="percent", min_value=0, max_value=1),
+            "Pos. esperada": st.column_config.NumberColumn(format="%.1f"),
+        }
+    )
+    st.caption(
+        f"{forecast['simulations']} simulaciones de {forecast['pending_matches']} partidos pendientes "
+        f"en {forecast['elapsed']:.2f} s ({forecast['workers']} procesos), con el orden PG, DG, JG."
+    )
+    if st.session_state.config.get('algorithm') == MEXICANO_ALGORITHM:
+        st.caption("En formato Mexicano solo se simulan las rondas ya generadas.")
+    with st.expander("Probabilidad de cada posición"):
+        positions = pd.DataFrame(
+            probabilities * 100,
+            index=df_forecast["Jugador"],
+            columns=[f"{p}º" for p in range(1, len(ranking_ids) + 1)]
+        )
+        st.dataframe(positions.round(1), use_container_width=True)
+
+def render_score_import():
+    """Importación de resultados de una ronda o de todo el torneo desde un CSV o una tabla pegada."""
+    with st.expander("📥 Importar resultados (CSV o tabla pegada)"):
+        st.caption("Columnas: ronda, pista, games pareja 1, games pareja 2 (separadas por comas, punto y coma o tabuladores; cabecera opcional).")
+        st.file_uploader("Fichero CSV", type=["csv", "txt", "tsv"], key='import_file')
+        st.text_area("O pega aquí la tabla", key='import_text', placeholder="ronda,pista,games1,games2\n1,1,6,3\n1,2,4,6")
+        st.button("Validar e importar", on_click=on_import_scores)
+
+        report = st.session_state.pop('import_report', None)
+        if report is None:
+            return
+        if "error" in report:
+            st.error(f"No se pudo leer la tabla: {report['error']}")
+        elif "errors" in report:
+            st.error(f"Se encontraron {len(report['errors'])} problemas; no se ha importado ningún resultado.")
+            st.dataframe(report['errors'], hide_index=True, use_container_width=True)
+        else:
+            st.success(f"Importados {report['imported']} resultados.")
+
+@instrumented()
+def render_round_inputs(tournament, round_num):
+    """Muestra los partidos de una ronda con un campo de resultado por pareja."""
+    for match_idx, row in enumerate(tournament.round_rows(round_num)):
+        pair1, pair2 = tournament.pairs(row)
+        p1_name = f"{pair1[0]} / {pair1[1]}"
+        p2_name = f"{pair2[0]} / {pair2[1]}"
         
-        players_assigned_this_round = set()
-        # Ajuste: Asegurar que num_courts no sea mayor que partidos posibles
-        max_matches_possible = len(players_this_round) // 4
-        actual_num_courts = min(num_courts, max_matches_possible)
+        col_match, col_score1, col_score2 = st.columns([3, 1, 1]) 
         
-        if actual_num_courts <= 0: # Si no hay suficientes jugadores para un partido
-            continue # Saltar esta iteración de ronda
-
-        possible_pairs = list(combinations(players_this_round, 2))
-        random.shuffle(possible_pairs)
-
-        # Intentar formar parejas que no hayan jugado juntas recientemente
-        potential_pairs = []
-        players_already_paired = set()
-        for p1, p2 in possible_pairs:
-            pair_tuple = tuple(sorted((p1, p2)))
-            priority = 1 if pair_tuple not in played_pairs else 0 
-            if p1 not in players_already_paired and p2 not in players_already_paired:
-                 potential_pairs.append( (priority, pair_tuple) )
-
-        potential_pairs.sort(key=lambda x: x[0], reverse=True) 
+        with col_match:
+            st.markdown(f"**Pista {tournament.matches[row, COURT]}**: {p1_name} **vs** {p2_name}")
         
-        final_round_pairs = []
-        players_in_final_pairs = set()
-        for _, pair_tuple in potential_pairs:
-            p1, p2 = pair_tuple
-            if p1 not in players_in_final_pairs and p2 not in players_in_final_pairs:
-                final_round_pairs.append(pair_tuple)
-                players_in_final_pairs.add(p1)
-                players_in_final_pairs.add(p2)
-
-        # --- Enfrentar Parejas ---
-        match_count = 0
-        assigned_players_in_match = set()
-        available_pairs_for_match = list(final_round_pairs) 
-        random.shuffle(available_pairs_for_match)
-
-        while match_count < actual_num_courts and len(available_pairs_for_match) >= 2:
-            pair1 = available_pairs_for_match.pop(0)
-            
-            found_opponent = False
-            for i in range(len(available_pairs_for_match)):
-                pair2 = available_pairs_for_match[i]
-                if not set(pair1) & set(pair2): 
-                    available_pairs_for_match.pop(i) 
-                    
-                    played_pairs.add(pair1)
-                    played_pairs.add(pair2)
-
-                    round_matches.append({
-                        "court": match_count + 1,
-                        "pair1": pair1,
-                        "pair2": pair2,
-                        "score1": None,
-                        "score2": None
-                    })
-                    assigned_players_in_match.update(pair1)
-                    assigned_players_in_match.update(pair2)
-                    match_count += 1
-                    found_opponent = True
-                    break 
-
-            if not found_opponent:
-                # No se encontró oponente, devolver pair1 si es necesario (poco probable aquí)
-                 pass
-
-        players_resting = [p for p in all_players if p not in assigned_players_in_match]
-
-        if round_matches:
-             fixture["rounds"].append({
-                 "round_num": len(fixture["rounds"]) + 1, 
-                 "matches": round_matches,
-                 "resting": players_resting
-             })
-
-    if not fixture["rounds"] and num_players >= 4 and num_courts >= 1:
-         st.warning("No se pudieron generar rondas con la configuración actual y el algoritmo simple. Intenta con más jugadores/pistas o revisa la lógica.")
-
-    return fixture
-
-def calculate_standings(players, fixture_data):
-    """Calcula la clasificación basada en los resultados introducidos en el fixture."""
-    # Reiniciar standings a cero antes de recalcular
-    standings = {
-        player: {"JG": 0, "JR": 0, "DG": 0, "PG": 0, "PP": 0, "PE": 0, "PJ": 0}
-        for player in players
-    }
-
-    if not fixture_data or 'rounds' not in fixture_data:
-        return standings, [] 
-
-    # Recalcular todo desde los scores actuales en session_state
-    processed_matches_for_player_stats = {p: set() for p in players} # Para evitar doble conteo de PJ/PG/PP/PE
-
-    for round_idx, round_data in enumerate(fixture_data['rounds']):
-        for match_idx, match in enumerate(round_data['matches']):
-            match_id = f"r{round_data['round_num']}_m{match_idx}" # Identificador único del partido
-            
-            score1_key = f"score1_{match_id}"
-            score2_key = f"score2_{match_id}"
-
-            score1 = st.session_state.get(score1_key) # Obtener de session_state, puede ser None o 0
-            score2 = st.session_state.get(score2_key)
-
-            # Convertir a int si no es None, manejar 0 como válido
-            s1 = int(score1) if score1 is not None else None
-            s2 = int(score2) if score2 is not None else None
-
-            # Actualizar el fixture en session_state (aunque ya leemos de él)
-            match['score1'] = s1 
-            match['score2'] = s2
-
-            if s1 is not None and s2 is not None:
-                pair1 = match['pair1']
-                pair2 = match['pair2']
-
-                # Actualizar Games Ganados/Recibidos (siempre se suman)
-                for p in pair1:
-                    standings[p]['JG'] += s1
-                    standings[p]['JR'] += s2
-                for p in pair2:
-                    standings[p]['JG'] += s2
-                    standings[p]['JR'] += s1
-
-                # Actualizar PJ/PG/PP/PE (solo una vez por partido por jugador)
-                if s1 > s2: # Gana Pareja 1
-                    outcome1, outcome2 = 'PG', 'PP'
-                elif s2 > s1: # Gana Pareja 2
-                    outcome1, outcome2 = 'PP', 'PG'
-                else: # Empate
-                    outcome1, outcome2 = 'PE', 'PE'
-
-                for p in pair1:
-                    if match_id not in processed_matches_for_player_stats[p]:
-                        standings[p]['PJ'] += 1
-                        standings[p][outcome1] += 1
-                        processed_matches_for_player_stats[p].add(match_id)
-                for p in pair2:
-                     if match_id not in processed_matches_for_player_stats[p]:
-                        standings[p]['PJ'] += 1
-                        standings[p][outcome2] += 1
-                        processed_matches_for_player_stats[p].add(match_id)
-
-
-    # Calcular Diferencia de Games al final
-    for player in players:
-        standings[player]['DG'] = standings[player]['JG'] - standings[player]['JR']
-
-    # Ordenar: 1º PG (desc), 2º DG (desc), 3º JG (desc)
-    sorted_players = sorted(
-        players,
-        key=lambda p: (standings[p]['PG'], standings[p]['DG'], standings[p]['JG']),
-        reverse=True
+        # Claves únicas para los inputs de resultado. El valor sale del modelo:
+        # las claves de los inputs de rondas no mostradas no se conservan.
+        match_id = match_id_for(round_num, match_idx)
+        score1_key = f"score1_{match_id}"
+        score2_key = f"score2_{match_id}"
+        st.session_state[score1_key], st.session_state[score2_key] = tournament.score(row)
+
+        with col_score1:
+            st.number_input(
+                f"Games {pair1[0].split()[0]}/{pair1[1].split()[0]}", 
+                min_value=0, 
+                max_value=MAX_SCORE,
+                step=1, 
+                value=None,
+                key=score1_key, 
+                on_change=on_score_change,
+                args=(row, match_id),
+                format="%d", # Asegurar formato entero
+                label_visibility="collapsed" 
+            )
+        
+        with col_score2:
+            st.number_input(
+                f"Games {pair2[0].split()[0]}/{pair2[1].split()[0]}", 
+                min_value=0, 
+                max_value=MAX_SCORE,
+                step=1, 
+                value=None,
+                key=score2_key,
+                on_change=on_score_change,
+                args=(row, match_id),
+                format="%d",
+                label_visibility="collapsed"
+            )
+        st.divider()
+
+@instrumented()
+def render_round_editor(tournament, round_num):
+    """Muestra los partidos de una ronda en una única tabla editable (un widget por ronda)."""
+    rows = tournament.round_rows(round_num)
+    scores = tournament.matches[rows.start:rows.stop, SCORE1:SCORE2 + 1]
+    df_round = pd.DataFrame({
+        "Pista": tournament.matches[rows.start:rows.stop, COURT],
+        "Pareja 1": [" / ".join(tournament.pairs(row)[0]) for row in rows],
+        "Pareja 2": [" / ".join(tournament.pairs(row)[1]) for row in rows],
+        "Games 1": pd.array(np.where(scores[:, 0] == NO_SCORE, None, scores[:, 0]), dtype="Int64"),
+        "Games 2": pd.array(np.where(scores[:, 1] == NO_SCORE, None, scores[:, 1]), dtype="Int64"),
+    })
+    st.data_editor(
+        df_round,
+        key=f"editor_r{round_num}",
+        on_change=on_round_editor_change,
+        args=(round_num,),
+        disabled=["Pista", "Pareja 1", "Pareja 2"],
+        column_config={
+            "Games 1": st.column_config.NumberColumn(min_value=0, max_value=MAX_SCORE, step=1, format="%d"),
+            "Games 2": st.column_config.NumberColumn(min_value=0, max_value=MAX_SCORE, step=1, format="%d"),
+        },
+        hide_index=True,
+        num_rows="fixed",
+        use_container_width=True
     )
 
-    return standings, sorted_players
-
-def generate_standings_text(standings, sorted_players, tournament_name):
-    """Genera el texto formateado para la clasificación."""
-    header = f"--- CLASIFICACIÓN: {tournament_name} ---\n"
-    separator = "-" * 75 + "\n"
-    col_headers = f"{'Pos':<4} {'Jugador':<20} {'PJ':<4} {'PG':<4} {'PE':<4} {'PP':<4} {'JG':<6} {'JR':<6} {'DG':<6}\n"
-    
-    lines = [header, separator, col_headers, separator]
-    
-    for i, player in enumerate(sorted_players):
-        stats = standings[player]
-        lines.append(
-            f"{i+1:<4} {player:<20} {stats['PJ']:<4} {stats['PG']:<4} {stats['PE']:<4} {stats['PP']:<4} {stats['JG']:<6} {stats['JR']:<6} {stats['DG']:<6}\n"
-        )
-    
-    lines.append(separator)
-    return "".join(lines)
+@st.fragment
+@instrumented()
+def render_selected_round(round_num, render_mode):
+    """Entrada de resultados de una sola ronda. Al ser un fragmento, editar un
+    resultado solo vuelve a ejecutar esta función y no el script completo."""
+    tournament = st.session_state.tournament
+    resting = tournament.resting(round_num)
+    if resting:
+         st.caption(f"Descansan: {', '.join(resting)}")
+    if render_mode == "Tabla por ronda":
+        render_round_editor(tournament, round_num)
+    else:
+        render_round_inputs(tournament, round_num)
+    flush_pending_scores()
+
+@st.cache_resource
+def get_fixture_cache():
+    """Caché de fixtures compartida por todas las sesiones (con nivel en disco si se configura)."""
+    return FixtureCache(maxsize=128, disk_dir=os.environ.get("PADEL_FIXTURE_CACHE_DIR"))
+
+@st.cache_resource
+def get_forecast_pool():
+    """Pool de procesos del pronóstico, arrancado una vez y compartido (None con un solo núcleo)."""
+    workers = os.cpu_count() or 1
+    return ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+
+@st.cache_resource
+def get_store():
+    """Almacén SQLite compartido por todas las sesiones del servidor."""
+    return TournamentStore(os.environ.get("PADEL_DB_PATH", "torneos.db"))
+
+@instrumented()
+def resume_tournament(tournament_id):
+    """Carga un torneo guardado (con sus resultados) en la sesión."""
+    store = get_store()
+    tournament = store.load_tournament(tournament_id)
+    st.session_state.config = store.load_config(tournament_id)
+    st.session_state.players = tournament.players
+    st.session_state.tournament = tournament
+    st.session_state.tournament_id = tournament_id
+    st.session_state.standings_engine = None
+    st.session_state.cooccurrence = None
+    st.session_state.score_buffer = ScoreWriteBuffer()
+    st.session_state.synced_version = store.score_version(tournament_id)
+    st.session_state.tournament_configured = True
+
+# Modos de la pestaña de resultados: los dos primeros solo construyen la ronda seleccionada
+RENDER_MODES = ("Tabla por ronda", "Campos por ronda", "Todas las rondas")
+
+# Desempates opcionales que se aplican después de PG, DG y JG
+TIEBREAKER_LABELS = {
+    "head_to_head": "Enfrentamiento directo",
+    "ratio_games": "Ratio de games (JG / jugados)",
+}
+
+# Algoritmos de generación de fixture disponibles en la configuración
+FIXTURE_ALGORITHMS = {
+    "Rotación circular (sin repetir parejas)": generate_rotation_fixture,
+    "Optimizado (multi-arranque)": optimize_fixture,
+    "Aleatorio simplificado": generate_simplified_fixture,
+    "Mexicano (ronda a ronda según la clasificación)": generate_mexicano_fixture,
+}
+# Con este algoritmo solo se genera la primera ronda; las demás salen de la clasificación
+MEXICANO_ALGORITHM = "Mexicano (ronda a ronda según la clasificación)"
+
+# Semilla fija del pronóstico: el mismo estado del torneo da siempre las mismas probabilidades
+FORECAST_SEED = 2024
 
 # --- Interfaz de Streamlit ---
 
@@ -219,12 +496,30 @@ if 'tournament_configured' not in st.session_state:
     st.session_state.tournament_configured = False
     st.session_state.config = {}
     st.session_state.players = []
-    st.session_state.fixture = None
+    st.session_state.tournament = None
+    st.session_state.tournament_id = None
+    st.session_state.standings_engine = None
+    st.session_state.cooccurrence = None
+    st.session_state.score_buffer = ScoreWriteBuffer()
     st.session_state.player_inputs = {} # Para guardar temporalmente nombres
 
+# Instrumentación opcional: el panel solo aparece con ?admin=1 (o PADEL_ADMIN=1)
+if 'profiler' not in st.session_state:
+    st.session_state.profiler = Profiler()
+show_admin_panel = st.query_params.get("admin") == "1" or os.environ.get("PADEL_ADMIN") == "1"
+if get_session_profiler() is not None:
+    st.session_state.profiler.start_rerun()
+
 # --- Fase 1: Configuración del Torneo ---
 if not st.session_state.tournament_configured:
     st.header("1. Configuración del Torneo")
+
+    saved_tournaments = get_store().list_tournaments()
+    if saved_tournaments:
+        with st.expander("📂 Reanudar un torneo guardado"):
+            saved_labels = {tid: f"#{tid} · {name}" for tid, name, _ in saved_tournaments}
+            selected_tournament = st.selectbox("Torneo", list(saved_labels), format_func=saved_labels.get)
+            st.button("Reanudar torneo", on_click=resume_tournament, args=(selected_tournament,))
     
     with st.form("config_form"):
         config = {}
@@ -249,6 +544,27 @@ if not st.session_state.tournament_configured:
                 value=num_courts_value
             )
 
+        algorithm_names = list(FIXTURE_ALGORITHMS)
+        config['algorithm'] = st.selectbox(
+            "Algoritmo de generación del fixture",
+            algorithm_names,
+            index=algorithm_names.index(st.session_state.config.get('algorithm', algorithm_names[0]))
+        )
+        config['optimizer_candidates'] = st.number_input(
+            "Candidatos que evalúa el optimizador",
+            min_value=1,
+            step=8,
+            value=int(st.session_state.config.get('optimizer_candidates', SEEDED_CANDIDATES)),
+            help="Solo se usa con el algoritmo optimizado. Más candidatos tardan más pero suelen dar un fixture mejor."
+        )
+        config['seed'] = st.number_input(
+            "Semilla del fixture",
+            min_value=0,
+            step=1,
+            value=st.session_state.config.get('seed', 0),
+            help="Con la misma plantilla, configuración y semilla se obtiene siempre el mismo fixture."
+        )
+
         st.subheader("Nombres de los Jugadores")
         player_names_inputs = {} 
         cols_players = st.columns(3) # Organizar en columnas para mejor layout
@@ -292,9 +608,26 @@ if not st.session_state.tournament_configured:
                 st.session_state.players = players
                 
                 # Generar Fixture usando adjusted_courts
-                st.session_state.fixture = generate_simplified_fixture(players, adjusted_courts)
+                fixture_generator = FIXTURE_ALGORITHMS[config['algorithm']]
+                # El optimizador depende también de cuántos candidatos evalúa
+                extra_params = {'candidates': config['optimizer_candidates']} if fixture_generator is optimize_fixture else {}
+                with timed("generate_fixture"):
+                    fixture = get_fixture_cache().get_or_generate(
+                        fixture_generator,
+                        players,
+                        adjusted_courts,
+                        algorithm=config['algorithm'],
+                        seed=config['seed'],
+                        **extra_params
+                    )
+                # En la sesión solo se guarda el modelo compacto, no el dict del generador
+                st.session_state.tournament = TournamentModel.from_fixture(players, fixture)
+                st.session_state.standings_engine = None
+                st.session_state.cooccurrence = None
                 
-                if st.session_state.fixture and st.session_state.fixture['rounds']:
+                if st.session_state.tournament.num_matches:
+                     st.session_state.tournament_id = get_store().create_tournament(config, st.session_state.tournament)
+                     st.session_state.synced_version = 0
                      st.session_state.tournament_configured = True
                      st.success("¡Torneo configurado y fixture generado!")
                      # Limpiar inputs temporales
@@ -310,131 +643,178 @@ if not st.session_state.tournament_configured:
 # --- Fase 2: Visualización y Gestión del Torneo ---
 if st.session_state.tournament_configured:
     st.header(f"🏆 Torneo: {st.session_state.config.get('name', 'Sin Nombre')}")
-    st.caption(f"{len(st.session_state.players)} jugadores | {st.session_state.config.get('num_courts', '?')} pistas configuradas")
+    st.caption(f"{len(st.session_state.players)} jugadores | {st.session_state.config.get('num_courts', '?')} pistas configuradas | Torneo #{st.session_state.tournament_id}")
 
     # Calcular standings ANTES de mostrar las pestañas
-    if st.session_state.fixture and 'rounds' in st.session_state.fixture:
-        # Recalcular standings en cada interacción
-        standings, sorted_players = calculate_standings(st.session_state.players, st.session_state.fixture)
+    tournament = st.session_state.tournament
+    if tournament is not None:
+        # Los callbacks de los inputs ya han aplicado los cambios de resultado
+        engine = get_standings_engine()
+        sorted_players = engine.sorted_players
+        # Guardar de una vez todos los resultados cambiados en este rerun
+        flush_pending_scores()
     else:
-        standings, sorted_players = {}, []
+        engine, sorted_players = None, []
         st.error("Error: No se encontró un fixture válido en el estado.")
 
+    # Resultados enviados desde la pista con score_server.py (u otras sesiones)
+    if tournament is not None and st.toggle("📡 Recibir resultados en vivo (API de árbitros)", key='live_updates'):
+        poll_live_scores()
+
 
-    tab1, tab2 = st.tabs(["📝 Rondas y Resultados", "📊 Clasificación"])
+    tab1, tab2, tab3 = st.tabs(["📝 Rondas y Resultados", "📊 Clasificación", "⚖️ Equidad"])
 
     with tab1:
         st.subheader("Partidos por Ronda")
         
-        if not st.session_state.fixture or not st.session_state.fixture['rounds']:
+        if tournament is None or not tournament.num_matches:
              st.warning("No hay rondas generadas para este torneo.")
         else:
-            # Crear una pestaña Streamlit para cada ronda del fixture
-            round_tabs = st.tabs([f"Ronda {r['round_num']}" for r in st.session_state.fixture['rounds']])
-
-            for i, round_data in enumerate(st.session_state.fixture['rounds']):
-                with round_tabs[i]:
-                    st.markdown(f"**Ronda {round_data['round_num']}**")
-                    if round_data['resting']:
-                         st.caption(f"Descansan: {', '.join(round_data['resting'])}")
-                    
-                    if not round_data['matches']:
-                        st.info("No hay partidos programados en esta ronda.")
-                        continue
-
-                    # Mostrar partidos y campos para resultados
-                    for match_idx, match in enumerate(round_data['matches']):
-                        p1_name = f"{match['pair1'][0]} / {match['pair1'][1]}"
-                        p2_name = f"{match['pair2'][0]} / {match['pair2'][1]}"
-                        
-                        col_match, col_score1, col_score2 = st.columns([3, 1, 1]) 
-                        
-                        with col_match:
-                            st.markdown(f"**Pista {match['court']}**: {p1_name} **vs** {p2_name}")
-                        
-                        # Claves únicas para los inputs de resultado
-                        match_id = f"r{round_data['round_num']}_m{match_idx}"
-                        score1_key = f"score1_{match_id}"
-                        score2_key = f"score2_{match_id}"
-
-                        with col_score1:
-                            st.number_input(
-                                f"Games {match['pair1'][0].split()[0]}/{match['pair1'][1].split()[0]}", 
-                                min_value=0, 
-                                step=1, 
-                                value=st.session_state.get(score1_key), # Leer valor actual del estado
-                                key=score1_key, 
-                                format="%d", # Asegurar formato entero
-                                label_visibility="collapsed" 
-                            )
-                        
-                        with col_score2:
-                            st.number_input(
-                                f"Games {match['pair2'][0].split()[0]}/{match['pair2'][1].split()[0]}", 
-                                min_value=0, 
-                                step=1, 
-                                value=st.session_state.get(score2_key), 
-                                key=score2_key,
-                                format="%d",
-                                label_visibility="collapsed"
-                            )
-                        st.divider()
+            with st.expander("📐 Calidad del fixture"):
+                quality = get_fixture_quality(tournament)
+                q1, q2, q3, q4, q5 = st.columns(5)
+                q1.metric("Parejas repetidas", quality['repeated_partners'])
+                q2.metric("Rivales repetidos", quality['repeated_opponents'])
+                q3.metric("Desequilibrio descansos", quality['rest_imbalance'])
+                q4.metric("Desequilibrio pistas", quality['court_imbalance'])
+                q5.metric("Puntuación (menor es mejor)", quality['total'])
+                optimizer_report = tournament.quality
+                if optimizer_report:
+                    st.caption(
+                        f"Optimizador: {optimizer_report['candidates']} candidatos en "
+                        f"{optimizer_report['elapsed']:.1f} s con {optimizer_report['workers']} procesos "
+                        f"({optimizer_report['candidates_per_second']:.1f} candidatos/s)"
+                    )
+                cache_stats = get_fixture_cache().stats()
+                st.caption(
+                    f"Caché de fixtures: {cache_stats['hits']} aciertos en memoria, "
+                    f"{cache_stats['disk_hits']} en disco, {cache_stats['misses']} fallos "
+                    f"({cache_stats['size']}/{cache_stats['maxsize']} entradas)"
+                )
+
+            render_score_import()
+
+            render_mode = st.radio("Entrada de resultados", RENDER_MODES, key='render_mode', horizontal=True)
+
+            if render_mode == "Todas las rondas":
+                # Modo clásico: una pestaña por ronda, todas construidas en cada rerun
+                round_tabs = st.tabs([f"Ronda {round_num}" for round_num in tournament.round_numbers])
+
+                for i, round_num in enumerate(tournament.round_numbers):
+                    with round_tabs[i]:
+                        st.markdown(f"**Ronda {round_num}**")
+                        resting = tournament.resting(round_num)
+                        if resting:
+                             st.caption(f"Descansan: {', '.join(resting)}")
+
+                        # Mostrar partidos y campos para resultados
+                        render_round_inputs(tournament, round_num)
+            else:
+                # Solo se construye la ronda seleccionada
+                selected_round = st.selectbox(
+                    "Ronda",
+                    tournament.round_numbers,
+                    format_func=lambda r: f"Ronda {r}",
+                    key='selected_round'
+                )
+                render_selected_round(selected_round, render_mode)
+
+            if st.session_state.config.get('algorithm') == MEXICANO_ALGORITHM:
+                st.divider()
+                st.button(
+                    f"➕ Generar ronda {tournament.round_numbers[-1] + 1} según la clasificación",
+                    on_click=generate_next_round,
+                    help="Agrupa en cada pista a jugadores de posiciones cercanas (1º y 4º contra 2º y 3º)."
+                )
+                next_round_error = st.session_state.pop('next_round_error', None)
+                if next_round_error:
+                    st.warning(next_round_error)
 
 
     with tab2:
         st.subheader("Tabla de Clasificación")
         
-        if not standings or not sorted_players:
+        if st.session_state.get('render_mode', RENDER_MODES[0]) != "Todas las rondas":
+            # Los resultados de la ronda se editan en un fragmento, que no vuelve a dibujar esta pestaña
+            st.button("🔄 Actualizar clasificación")
+
+        if not sorted_players:
             st.info("Aún no hay resultados ingresados o suficientes para calcular la clasificación.")
         else:
-             # Convertir standings a DataFrame para mostrar en tabla
-             standings_list = []
-             for pos, player_name in enumerate(sorted_players):
-                 stats = standings[player_name]
-                 standings_list.append({
-                     "Pos": pos + 1,
-                     "Jugador": player_name,
-                     "PJ": stats['PJ'],
-                     "PG": stats['PG'],
-                     "PE": stats['PE'],
-                     "PP": stats['PP'],
-                     "JG": stats['JG'],
-                     "JR": stats['JR'],
-                     "DG": stats['DG']
-                 })
-             
-             df_standings = pd.DataFrame(standings_list)
+             extra_tiebreakers = st.multiselect(
+                 "Desempates adicionales (tras PG, DG y JG)",
+                 list(TIEBREAKER_LABELS),
+                 format_func=TIEBREAKER_LABELS.get,
+                 key='tiebreakers'
+             )
+             if extra_tiebreakers:
+                 # Orden vectorizado con lexsort sobre los totales del acumulador
+                 with timed("rank_players"):
+                     ranking_ids = rank_players(engine.totals, tournament.matches, DEFAULT_RANKING + tuple(extra_tiebreakers))
+             else:
+                 ranking_ids = engine.sorted_ids
+
+             # Convertir standings a DataFrame directamente desde la matriz de totales
+             with timed("standings_dataframe"):
+                 df_standings = standings_frame(engine.totals, ranking_ids, tournament.players, STAT_COLUMNS)
              
-             # Usar st.dataframe para tabla interactiva
-             # Ocultar índice de pandas, usar nuestra columna 'Pos'
-             st.dataframe(df_standings.set_index('Pos'), use_container_width=True) 
-
-             # Botón de descarga
-             st.download_button(
-                 label="📄 Descargar Clasificación (.txt)",
-                 data=generate_standings_text(standings, sorted_players, st.session_state.config.get('name', 'Torneo')),
-                 file_name=f"clasificacion_{st.session_state.config.get('name', 'torneo').replace(' ', '_')}.txt",
-                 mime='text/plain'
+                 # Usar st.dataframe para tabla interactiva
+                 # Ocultar índice de pandas, usar nuestra columna 'Pos'
+                 st.dataframe(df_standings.set_index('Pos'), use_container_width=True) 
+
+             # Botones de descarga: se serializa al pulsar y solo si ha cambiado algún resultado
+             file_suffix = st.session_state.config.get('name', 'torneo').replace(' ', '_')
+             render_export_buttons(
+                 "📄 Clasificación", f"standings_{'_'.join(extra_tiebreakers)}", lambda: df_standings, engine.version,
+                 ["txt"] + [fmt for fmt in EXPORT_FORMATS if fmt != "txt"], f"clasificacion_{file_suffix}"
              )
+             matches_snapshot = tournament.matches.copy()
+             render_export_buttons(
+                 "📜 Historial de partidos", "history", lambda: history_frame(tournament.players, matches_snapshot),
+                 # En Mexicano el historial también cambia al añadir una ronda
+                 (engine.version, tournament.num_matches),
+                 [fmt for fmt in EXPORT_FORMATS if fmt != "txt"], f"historial_{file_suffix}"
+             )
+
+             if st.toggle("🔮 Pronóstico de la clasificación final", key='show_forecast',
+                          help="Simula los partidos que faltan para estimar quién puede terminar en cada posición."):
+                 render_forecast(tournament, engine, ranking_ids)
              
+    with tab3:
+        st.subheader("Equidad del fixture")
+        if tournament is None or not tournament.num_matches:
+            st.info("Aún no hay partidos programados.")
+        else:
+            render_fairness(tournament)
+
     # Botón para reiniciar (opcional)
     st.divider()
-    if st.button("⚠️ Empezar Nuevo Torneo (Borrar Datos Actuales)"):
+    if st.button("⚠️ Empezar Nuevo Torneo (el actual queda guardado)"):
         # Limpiar todo el estado de sesión relacionado con el torneo
-        keys_to_delete = ['tournament_configured', 'config', 'players', 'fixture', 'player_inputs']
+        keys_to_delete = ['tournament_configured', 'config', 'players', 'tournament', 'tournament_id', 'standings_engine', 'cooccurrence', 'score_buffer', 'tiebreakers', 'render_mode', 'selected_round', 'player_inputs', 'import_file', 'import_text', 'import_report', 'export_cache', 'next_round_error', 'fairness_matrix', 'live_updates', 'synced_version', 'show_forecast', 'forecast', 'fixture_quality']
         # También borrar las claves de resultados (que tienen formato dinámico)
         result_keys = [k for k in st.session_state.keys() if k.startswith('score1_') or k.startswith('score2_')]
         keys_to_delete.extend(result_keys)
         
         for key in list(st.session_state.keys()): # Iterar sobre una copia de las claves
-             if key in keys_to_delete or key.startswith('score1_') or key.startswith('score2_') or key.startswith("player_"):
+             if key in keys_to_delete or key.startswith('score1_') or key.startswith('score2_') or key.startswith('editor_r') or key.startswith("player_"):
                  del st.session_state[key]
         
         # Reinicializar valores por defecto importantes
         st.session_state.tournament_configured = False
         st.session_state.config = {}
         st.session_state.players = []
-        st.session_state.fixture = None
+        st.session_state.tournament = None
+        st.session_state.tournament_id = None
+        st.session_state.standings_engine = None
+        st.session_state.cooccurrence = None
+        st.session_state.score_buffer = ScoreWriteBuffer()
         st.session_state.player_inputs = {}
 
-        st.rerun() # --- CORREGIDO ---
\ No newline at end of file
+        st.rerun() # --- CORREGIDO ---
+
+# Cierre de la medida del rerun (los reruns interrumpidos con st.rerun no se cuentan)
+if get_session_profiler() is not None:
+    st.session_state.profiler.end_rerun(st.session_state)
+if show_admin_panel:
+    render_admin_panel(st.session_state.profiler)
@@ -0,0 +1,90 @@
+"""Índice de coincidencias entre jugadores.
+
+Cuenta cuántas veces ha jugado cada par de jugadores como compañeros y como
+rivales (matrices N×N simétricas de `int16`) y cuántos partidos y descansos
+lleva cada jugador (vectores de longitud N). Se sincroniza con el
+`TournamentModel` contando solo las rondas añadidas desde la última vez, así
+que la pestaña de equidad no recorre el fixture entero en cada rerun y el
+generador Mexicano puede consultar en O(1) si una pareja ya ha jugado junta.
+"""
+
+import numpy as np
+
+from model import ROUND, P1, P2, P3, P4
+
+# Las coincidencias de un par no pasan del número de rondas: 16 bits bastan y
+# las dos matrices N×N ocupan la mitad que con `int32`
+PAIR_COUNT_DTYPE = np.int16
+
+SUMMARY_KEYS = (
+    "repeated_partners", "repeated_opponents", "max_partner_count", "max_opponent_count",
+    "never_partnered", "never_opposed", "games_min", "games_max", "rests_min", "rests_max",
+)
+
+
+class CooccurrenceIndex:
+    """Contadores de compañeros, rivales, partidos y descansos por id de jugador."""
+
+    def __init__(self, num_players):
+        self.num_players = num_players
+        self.partners = np.zeros((num_players, num_players), dtype=PAIR_COUNT_DTYPE)
+        self.opponents = np.zeros((num_players, num_players), dtype=PAIR_COUNT_DTYPE)
+        self.games = np.zeros(num_players, dtype=np.int32)
+        self.rests = np.zeros(num_players, dtype=np.int32)
+        self.rounds = 0
+        # Filas de `TournamentModel.matches` ya contadas (para `sync`)
+        self.rows_seen = 0
+
+    @classmethod
+    def from_model(cls, model):
+        index = cls(len(model.players))
+        index.sync(model)
+        return index
+
+    def sync(self, model):
+        """Cuenta las rondas del modelo añadidas desde la última llamada (solo las nuevas)."""
+        if model.num_matches == self.rows_seen:
+            return
+        new = model.matches[self.rows_seen:]
+        ids = new[:, [P1, P2, P3, P4]]
+        # Vectorizado con np.add.at: los pares repetidos dentro del lote se suman bien
+        for x, y in ((P1, P2), (P3, P4)):
+            np.add.at(self.partners, (new[:, x], new[:, y]), 1)
+            np.add.at(self.partners, (new[:, y], new[:, x]), 1)
+        for x in (P1, P2):
+            for y in (P3, P4):
+                np.add.at(self.opponents, (new[:, x], new[:, y]), 1)
+                np.add.at(self.opponents, (new[:, y], new[:, x]), 1)
+        self.games += np.bincount(ids.ravel(), minlength=self.num_players).astype(np.int32)
+        for round_num in np.unique(new[:, ROUND]):
+            playing = np.zeros(self.num_players, dtype=bool)
+            playing[ids[new[:, ROUND] == round_num].ravel()] = True
+            self.rests += ~playing
+            self.rounds += 1
+        self.rows_seen = model.num_matches
+
+    def partner_count(self, a, b):
+        return int(self.partners[a, b])
+
+    def opponent_count(self, a, b):
+        return int(self.opponents[a, b])
+
+    def summary(self):
+        """Métricas de equidad: repeticiones por encima de la primera vez y desequilibrios."""
+        if self.num_players < 2:
+            return dict.fromkeys(SUMMARY_KEYS, 0)
+        upper = np.triu_indices(self.num_players, k=1)
+        partners = self.partners[upper]
+        opponents = self.opponents[upper]
+        return {
+            "repeated_partners": int(np.maximum(partners - 1, 0).sum()),
+            "repeated_opponents": int(np.maximum(opponents - 1, 0).sum()),
+            "max_partner_count": int(partners.max()),
+            "max_opponent_count": int(opponents.max()),
+            "never_partnered": int((partners == 0).sum()),
+            "never_opposed": int((opponents == 0).sum()),
+            "games_min": int(self.games.min()),
+            "games_max": int(self.games.max()),
+            "rests_min": int(self.rests.min()),
+            "rests_max": int(self.rests.max()),
+        }
@@ -0,0 +1,142 @@
+"""Exportación de la clasificación y del historial de partidos.
+
+Formatos: CSV, JSON, Parquet (si está instalado `pyarrow`) y el texto de
+ancho fijo de siempre. Cada exportador escribe por trozos de filas en
+cualquier fichero binario, sin montar todo el documento en una sola
+cadena; `export_bytes` los escribe en memoria porque la descarga de
+Streamlit necesita el fichero completo en bytes. `ExportCache`
+guarda el último resultado de cada exportación junto con la versión de la
+clasificación con la que se generó, de modo que solo se vuelve a serializar
+cuando ha cambiado algún resultado.
+"""
+
+import io
+import threading
+
+import numpy as np
+import pandas as pd
+
+from model import ROUND, COURT, P1, P4, SCORE1, SCORE2, NO_SCORE
+from tournament import iter_standings_text
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet es opcional
+    pa = pq = None
+
+# Filas por trozo al escribir una exportación
+CHUNK_ROWS = 5000
+
+STANDINGS_COLUMNS = ["Pos", "Jugador", "PJ", "PG", "PE", "PP", "JG", "JR", "DG"]
+HISTORY_COLUMNS = ["Ronda", "Pista", "Pareja 1", "Pareja 2", "Games 1", "Games 2", "Ganador"]
+
+
+def standings_frame(totals, ranking_ids, players, stat_columns):
+    """Tabla de clasificación (una fila por jugador, en el orden de `ranking_ids`)."""
+    df = pd.DataFrame(totals[ranking_ids], columns=stat_columns)
+    df.insert(0, "Jugador", [players[i] for i in ranking_ids])
+    df.insert(0, "Pos", range(1, len(ranking_ids) + 1))
+    return df[STANDINGS_COLUMNS]
+
+
+def history_frame(players, matches):
+    """Historial de partidos con su resultado, ronda a ronda (vacío si aún no se ha jugado)."""
+    names = np.asarray(players, dtype=object)
+    ids = matches[:, P1:P4 + 1]
+    s1, s2 = matches[:, SCORE1], matches[:, SCORE2]
+    played = (s1 != NO_SCORE) & (s2 != NO_SCORE)
+    return pd.DataFrame({
+        "Ronda": matches[:, ROUND],
+        "Pista": matches[:, COURT],
+        "Pareja 1": names[ids[:, 0]] + " / " + names[ids[:, 1]],
+        "Pareja 2": names[ids[:, 2]] + " / " + names[ids[:, 3]],
+        "Games 1": pd.array(np.where(s1 == NO_SCORE, None, s1), dtype="Int64"),
+        "Games 2": pd.array(np.where(s2 == NO_SCORE, None, s2), dtype="Int64"),
+        "Ganador": np.select([~played, s1 > s2, s2 > s1], ["", "Pareja 1", "Pareja 2"], "Empate"),
+    })[HISTORY_COLUMNS]
+
+
+def _chunks(df):
+    for start in range(0, len(df), CHUNK_ROWS):
+        yield start, df.iloc[start:start + CHUNK_ROWS]
+
+
+def write_csv(df, out):
+    for start, chunk in _chunks(df):
+        out.write(chunk.to_csv(index=False, header=start == 0).encode("utf-8"))
+    if df.empty:
+        out.write(df.to_csv(index=False).encode("utf-8"))
+
+
+def write_json(df, out):
+    """Lista JSON de registros, escrita trozo a trozo."""
+    out.write(b"[")
+    for start, chunk in _chunks(df):
+        records = chunk.to_json(orient="records", force_ascii=False)[1:-1]
+        if records:
+            out.write((b"," if start else b"") + records.encode("utf-8"))
+    out.write(b"]")
+
+
+def write_parquet(df, out):
+    """Un grupo de filas de Parquet por trozo."""
+    schema = pa.Schema.from_pandas(df, preserve_index=False)
+    with pq.ParquetWriter(out, schema) as writer:
+        for _, chunk in _chunks(df):
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+
+
+def write_standings_text(df, out, tournament_name):
+    """El texto de ancho fijo de `generate_standings_text`, línea a línea."""
+    standings = df.set_index("Jugador")[STANDINGS_COLUMNS[2:]].to_dict("index")
+    for line in iter_standings_text(standings, df["Jugador"].tolist(), tournament_name):
+        out.write(line.encode("utf-8"))
+
+
+# Formatos disponibles: (etiqueta, extensión, tipo MIME, función de escritura)
+EXPORT_FORMATS = {
+    "csv": ("CSV", "csv", "text/csv", write_csv),
+    "json": ("JSON", "json", "application/json", write_json),
+    "txt": ("Texto", "txt", "text/plain", None),
+}
+if pq is not None:
+    EXPORT_FORMATS["parquet"] = ("Parquet", "parquet", "application/vnd.apache.parquet", write_parquet)
+
+
+def export_bytes(df, fmt, tournament_name="Torneo"):
+    """Serializa `df` en memoria en el formato pedido (`txt` solo tiene sentido para la clasificación).
+
+    El resultado ocupa el fichero completo: para escribir a disco sin
+    guardarlo entero en memoria, usa directamente el `write_*` del formato.
+    """
+    out = io.BytesIO()
+    if fmt == "txt":
+        write_standings_text(df, out, tournament_name)
+    else:
+        EXPORT_FORMATS[fmt][3](df, out)
+    return out.getvalue()
+
+
+class ExportCache:
+    """Último resultado de cada exportación, válido mientras no cambie la versión de la clasificación.
+
+    Es seguro entre hilos: las descargas diferidas de Streamlit se generan en
+    un hilo distinto al del script.
+    """
+
+    def __init__(self):
+        self.builds = 0
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get_or_build(self, key, version, build):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                return entry[1]
+        data = build()
+        with self._lock:
+            self.builds += 1
+            self._entries[key] = (version, data)
+        return data
@@ -0,0 +1,113 @@
+"""Caché de fixtures generados.
+
+La clave es (hash de la plantilla, pistas, rondas, algoritmo, semilla y
+parámetros extra del generador): con la misma configuración y semilla el
+fixture es el mismo, así que no hace falta volver a generarlo (el optimizador
+también lo es con semilla, porque entonces evalúa un número fijo de
+candidatos en lugar de buscar durante un tiempo). La caché en
+memoria es LRU y, opcionalmente, tiene un segundo nivel en disco (un JSON
+por fixture) que sobrevive a reinicios del servidor y se comparte entre
+procesos.
+"""
+
+import copy
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+
+def roster_hash(players):
+    """Hash estable de la plantilla (el orden importa: los generadores dependen de él)."""
+    return hashlib.sha256("\n".join(players).encode("utf-8")).hexdigest()
+
+
+def _from_json(fixture):
+    """El JSON convierte las tuplas de parejas en listas; se restauran."""
+    for round_data in fixture.get("rounds", []):
+        for match in round_data["matches"]:
+            match["pair1"] = tuple(match["pair1"])
+            match["pair2"] = tuple(match["pair2"])
+    return fixture
+
+
+class FixtureCache:
+    """Caché LRU de fixtures con nivel opcional en disco y contadores de aciertos/fallos."""
+
+    def __init__(self, maxsize=128, disk_dir=None):
+        self.maxsize = maxsize
+        self.disk_dir = disk_dir
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(players, num_courts, num_rounds, algorithm, seed, params=None):
+        extra = json.dumps(params or {}, sort_keys=True)
+        return f"{roster_hash(players)}|{num_courts}|{num_rounds}|{algorithm}|{seed}|{extra}"
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, hashlib.sha256(key.encode("utf-8")).hexdigest() + ".json")
+
+    def _remember(self, key, fixture):
+        self._memory[key] = fixture
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.maxsize:
+            self._memory.popitem(last=False)
+
+    def get(self, key):
+        """Devuelve una copia del fixture cacheado o None si no está en ningún nivel."""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(self._memory[key])
+        if self.disk_dir:
+            try:
+                with open(self._disk_path(key), encoding="utf-8") as f:
+                    fixture = _from_json(json.load(f))
+            except (OSError, ValueError):
+                fixture = None
+            if fixture is not None:
+                with self._lock:
+                    self.disk_hits += 1
+                    self._remember(key, fixture)
+                return copy.deepcopy(fixture)
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key, fixture):
+        with self._lock:
+            self._remember(key, copy.deepcopy(fixture))
+        if self.disk_dir:
+            # Escritura atómica: otro proceso nunca lee un JSON a medias
+            path = self._disk_path(key)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(fixture, f)
+            os.replace(tmp_path, path)
+
+    def get_or_generate(self, generator, players, num_courts, num_rounds=None, algorithm=None, seed=None, **params):
+        """Devuelve el fixture de la caché o lo genera con `generator(players, num_courts, num_rounds, seed=seed, **params)`."""
+        key = self.make_key(players, num_courts, num_rounds, algorithm or generator.__name__, seed, params)
+        fixture = self.get(key)
+        if fixture is None:
+            fixture = generator(players, num_courts, num_rounds, seed=seed, **params)
+            self.put(key, fixture)
+        return fixture
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "size": len(self._memory),
+                "maxsize": self.maxsize,
+            }
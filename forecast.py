@@ -0,0 +1,152 @@
+"""Pronóstico Monte Carlo de la clasificación final.
+
+Simula muchas veces los partidos que quedan sin resultado en el fixture y,
+para cada simulación, calcula la clasificación final con el mismo orden que
+`calculate_standings` (PG, DG y JG descendentes y, en empate, el orden de
+inscripción). Devuelve la probabilidad de que cada jugador termine en cada
+posición.
+
+Modelo de cada partido pendiente: la fuerza de una pareja es la media del
+porcentaje de games ganados por sus dos jugadores hasta ahora (suavizado
+con `prior_games` games ficticios al 50 %, para que al principio del torneo
+todos partan igual). La pareja 1 gana con probabilidad `f1 / (f1 + f2)` y el
+marcador (games del ganador y del perdedor) se sortea entre los marcadores
+ya jugados en el torneo, o entre marcadores típicos si aún no hay ninguno.
+
+Todo va vectorizado por lotes de simulaciones: los totales de cada
+simulación salen de multiplicar las matrices (simulaciones × partidos) de
+games por las matrices de incidencia (partidos × jugadores), y la
+clasificación de todas las simulaciones se ordena con un único `argsort`.
+Los lotes se reparten entre un pool de procesos cuando hay más de un núcleo.
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from model import P1, P2, P3, P4, SCORE1, SCORE2, NO_SCORE
+from standings import compute_totals, JG, JR, PG
+
+# Marcadores (ganador, perdedor) que se usan mientras no hay ningún partido jugado
+DEFAULT_SCORELINES = ((6, 0), (6, 1), (6, 2), (6, 3), (6, 4), (7, 5), (7, 6))
+
+# Simulaciones por lote (limita la memoria de las matrices simulaciones × partidos)
+CHUNK_SIMULATIONS = 5000
+
+
+def _scoreline_pool(played):
+    """Marcadores jugados como (games del ganador, games del perdedor)."""
+    if not len(played):
+        return np.array(DEFAULT_SCORELINES, dtype=np.int64)
+    scores = played[:, [SCORE1, SCORE2]].astype(np.int64)
+    return np.sort(scores, axis=1)[:, ::-1]
+
+
+def _win_probability(totals, pending, prior_games):
+    """Probabilidad de que gane la pareja 1 en cada partido pendiente."""
+    strength = (totals[:, JG] + prior_games / 2) / (totals[:, JG] + totals[:, JR] + prior_games)
+    pair1 = strength[pending[:, P1]] + strength[pending[:, P2]]
+    pair2 = strength[pending[:, P3]] + strength[pending[:, P4]]
+    return pair1 / (pair1 + pair2)
+
+
+def _incidence(pending, num_players):
+    """Matrices (partidos × jugadores) con un 1 donde el jugador forma parte de la pareja 1 o de la 2."""
+    rows = np.arange(len(pending))
+    pair1 = np.zeros((len(pending), num_players))
+    pair2 = np.zeros((len(pending), num_players))
+    for column in (P1, P2):
+        pair1[rows, pending[:, column]] = 1
+    for column in (P3, P4):
+        pair2[rows, pending[:, column]] = 1
+    return pair1, pair2
+
+
+def _simulate_chunk(base, pending, win_probability, scorelines, simulations, seed):
+    """Simula `simulations` finales del torneo; devuelve las veces (jugador, posición)."""
+    rng = np.random.default_rng(seed)
+    num_players = len(base)
+    pair1, pair2 = _incidence(pending, num_players)
+
+    pair1_wins = rng.random((simulations, len(pending))) < win_probability
+    drawn = scorelines[rng.integers(len(scorelines), size=(simulations, len(pending)))]
+    high, low = drawn[..., 0], drawn[..., 1]
+    games1 = np.where(pair1_wins, high, low)
+    games2 = np.where(pair1_wins, low, high)
+
+    # Totales finales (simulaciones × jugadores) de los tres criterios de la clasificación
+    won = base[:, JG] + games1 @ pair1 + games2 @ pair2
+    lost = base[:, JR] + games2 @ pair1 + games1 @ pair2
+    wins = base[:, PG] + (games1 > games2) @ pair1 + (games2 > games1) @ pair2
+    won, wins = won.astype(np.int64), wins.astype(np.int64)
+    diff = won - lost.astype(np.int64)
+
+    # Una sola clave entera por jugador: PG, luego DG, luego JG (todos no negativos)
+    diff_offset = int(np.abs(diff).max())
+    jg_base = int(won.max()) + 1
+    dg_base = (2 * diff_offset + 1) * jg_base
+    key = wins * dg_base + (diff + diff_offset) * jg_base + won
+    # Orden estable sobre la clave negada: en empate, el primero inscrito va delante
+    order = np.argsort(-key, axis=1, kind="stable")
+
+    positions = np.empty_like(order)
+    np.put_along_axis(positions, order, np.arange(num_players)[None, :], axis=1)
+    counts = np.bincount(
+        (np.arange(num_players)[None, :] * num_players + positions).ravel(),
+        minlength=num_players * num_players,
+    )
+    return counts.reshape(num_players, num_players)
+
+
+def forecast_positions(matches, num_players, simulations=20000, workers=None, seed=None,
+                       prior_games=6, executor=None):
+    """Probabilidad de cada posición final para cada jugador.
+
+    `matches` tiene el formato de `TournamentModel.matches`; los partidos sin
+    resultado son los que se simulan. Los lotes se reparten entre `workers`
+    procesos (por defecto, todos los núcleos) o entre los de `executor`, un
+    pool ya arrancado: la app reutiliza el suyo para no pagar el arranque de
+    los procesos en cada resultado. Devuelve un dict con `probabilities`
+    (jugadores × posiciones) y el informe de la ejecución.
+    """
+    started = time.perf_counter()
+    scored = (matches[:, SCORE1] != NO_SCORE) & (matches[:, SCORE2] != NO_SCORE)
+    played, pending = matches[scored], matches[~scored]
+    base = compute_totals(played, num_players)
+
+    if not len(pending):
+        # Nada que simular: la clasificación actual ya es la final
+        simulations = 1
+    win_probability = _win_probability(base, pending, prior_games)
+    scorelines = _scoreline_pool(played)
+
+    seed = seed or 0
+    chunks = [
+        (start, min(CHUNK_SIMULATIONS, simulations - start))
+        for start in range(0, simulations, CHUNK_SIMULATIONS)
+    ]
+    args = [
+        (base, pending, win_probability, scorelines, size, (seed, start))
+        for start, size in chunks
+    ]
+    workers = min(workers or os.cpu_count() or 1, len(chunks))
+    if executor is not None:
+        results = list(executor.map(_simulate_chunk, *zip(*args)))
+    elif workers == 1:
+        results = [_simulate_chunk(*chunk_args) for chunk_args in args]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_simulate_chunk, *zip(*args)))
+    counts = np.sum(results, axis=0)
+
+    probabilities = counts / simulations
+    return {
+        "probabilities": probabilities,
+        "expected_position": probabilities @ np.arange(1, num_players + 1),
+        "simulations": simulations,
+        "pending_matches": int(len(pending)),
+        "workers": workers,
+        "elapsed": time.perf_counter() - started,
+    }
@@ -0,0 +1,214 @@
+"""Instrumentación opcional de rendimiento.
+
+`Profiler` registra el tiempo de cada rerun del script, el tiempo y el
+número de llamadas de las funciones marcadas con `timed`/`instrumented`, y
+el tamaño del estado de la sesión. También puede perfilar un rerun por
+muestreo: un hilo aparte mira cada pocos milisegundos qué está ejecutando el
+hilo del script y cuenta las funciones que aparecen en la pila.
+
+El profiler activo lo decide la función registrada con
+`set_profiler_lookup` (la app devuelve el de la sesión en curso, así que
+cada sesión solo ve sus propias medidas). Sin profiler activo, `timed` no
+hace nada.
+"""
+
+import functools
+import json
+import pickle
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+
+_profiler_lookup = None
+
+
+def set_profiler_lookup(lookup):
+    """Registra la función sin argumentos que devuelve el profiler activo (o None)."""
+    global _profiler_lookup
+    _profiler_lookup = lookup
+
+
+def active_profiler():
+    return _profiler_lookup() if _profiler_lookup is not None else None
+
+
+@contextmanager
+def timed(name):
+    """Mide un bloque de código en el profiler activo, si lo hay."""
+    profiler = active_profiler()
+    if profiler is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        profiler.record(name, time.perf_counter() - started)
+
+
+def instrumented(name=None):
+    """Decorador equivalente a envolver la función en `timed(name)`."""
+    def decorator(func):
+        label = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with timed(label):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def session_state_size(state):
+    """Número de claves y bytes (serializados con pickle) del estado de sesión, y el tamaño de cada clave."""
+    sizes = {}
+    for key in list(state.keys()):
+        try:
+            sizes[str(key)] = len(pickle.dumps(state[key], protocol=pickle.HIGHEST_PROTOCOL))
+        except Exception:
+            # Objetos no serializables (p. ej. ficheros subidos): se cuentan aparte
+            sizes[str(key)] = None
+    return {
+        "keys": len(sizes),
+        "bytes": sum(size for size in sizes.values() if size is not None),
+        "per_key": dict(sorted(sizes.items(), key=lambda item: -(item[1] or 0))),
+    }
+
+
+class SamplingProfiler:
+    """Muestrea la pila de un hilo a intervalos fijos desde un hilo aparte."""
+
+    def __init__(self, thread_id, interval=0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = 0
+        self.own = Counter()
+        self.cumulative = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="padel-sampler", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            self.samples += 1
+            self.own[self._label(frame)] += 1
+            seen = set()
+            while frame is not None:
+                label = self._label(frame)
+                if label not in seen:
+                    seen.add(label)
+                    self.cumulative[label] += 1
+                frame = frame.f_back
+
+    @staticmethod
+    def _label(frame):
+        code = frame.f_code
+        return f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]}:{code.co_firstlineno})"
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self, top=25):
+        """Detiene el muestreo y devuelve las funciones con más muestras (propias y acumuladas)."""
+        self._stop.set()
+        self._thread.join()
+        return {
+            "interval_s": self.interval,
+            "samples": self.samples,
+            "own": self.own.most_common(top),
+            "cumulative": self.cumulative.most_common(top),
+        }
+
+
+class Profiler:
+    """Medidas de una sesión: reruns, funciones, tamaño de la sesión y el último perfil por muestreo."""
+
+    def __init__(self, max_reruns=200):
+        self.reruns = deque(maxlen=max_reruns)
+        self.functions = {}
+        self.session_size = None
+        self.sample = None
+        self.sample_next = False
+        self._rerun_started = None
+        self._sampler = None
+        self._lock = threading.Lock()
+
+    def record(self, name, elapsed):
+        with self._lock:
+            stats = self.functions.setdefault(name, {"calls": 0, "total_s": 0.0, "max_s": 0.0})
+            stats["calls"] += 1
+            stats["total_s"] += elapsed
+            stats["max_s"] = max(stats["max_s"], elapsed)
+
+    def start_rerun(self):
+        """Empieza a medir un rerun (y lo perfila por muestreo si se ha pedido)."""
+        if self._sampler is not None:
+            # El rerun anterior se interrumpió (p. ej. con st.rerun) antes de cerrarse
+            self.sample = self._sampler.stop()
+            self._sampler = None
+        self._rerun_started = time.perf_counter()
+        if self.sample_next:
+            self.sample_next = False
+            self._sampler = SamplingProfiler(threading.get_ident()).start()
+
+    def end_rerun(self, state=None):
+        """Cierra la medida del rerun en curso; con `state` mide también el tamaño de la sesión."""
+        if self._rerun_started is None:
+            return
+        elapsed = time.perf_counter() - self._rerun_started
+        self._rerun_started = None
+        with self._lock:
+            self.reruns.append({"timestamp": time.time(), "wall_s": elapsed})
+        if self._sampler is not None:
+            self.sample = self._sampler.stop()
+            self._sampler = None
+        if state is not None:
+            self.session_size = session_state_size(state)
+
+    def rerun_summary(self):
+        with self._lock:
+            reruns = list(self.reruns)
+        times = sorted(r["wall_s"] for r in reruns)
+        if not times:
+            return None
+        return {
+            "count": len(times),
+            "last_s": reruns[-1]["wall_s"],
+            "mean_s": sum(times) / len(times),
+            "p95_s": times[min(len(times) - 1, int(0.95 * len(times)))],
+            "max_s": times[-1],
+        }
+
+    def function_rows(self):
+        """Una fila por función medida, de mayor a menor tiempo total."""
+        with self._lock:
+            rows = [
+                {"function": name, "calls": s["calls"], "total_ms": s["total_s"] * 1000,
+                 "mean_ms": s["total_s"] * 1000 / s["calls"], "max_ms": s["max_s"] * 1000}
+                for name, s in self.functions.items()
+            ]
+        return sorted(rows, key=lambda row: -row["total_ms"])
+
+    def reset(self):
+        with self._lock:
+            self.reruns.clear()
+            self.functions.clear()
+            self.session_size = None
+            self.sample = None
+
+    def to_json(self):
+        """Informe completo en JSON (se puede generar desde otro hilo, p. ej. una descarga diferida)."""
+        with self._lock:
+            reruns = list(self.reruns)
+        return json.dumps({
+            "reruns": reruns,
+            "rerun_summary": self.rerun_summary(),
+            "functions": self.function_rows(),
+            "session_state": self.session_size,
+            "sample_profile": self.sample,
+        }, indent=2)
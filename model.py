@@ -0,0 +1,148 @@
+"""Modelo compacto del torneo.
+
+Los jugadores se internan a identificadores enteros y los partidos se
+guardan en una única matriz NumPy de ancho fijo (una fila por partido:
+ronda, pista, cuatro jugadores y dos resultados). Es lo que se guarda en la
+sesión en lugar del dict de listas de dicts con tuplas de nombres.
+"""
+
+import numpy as np
+
+# Columnas de la matriz de partidos
+ROUND, COURT, P1, P2, P3, P4, SCORE1, SCORE2 = range(8)
+MATCH_COLUMNS = ("round", "court", "p1", "p2", "p3", "p4", "score1", "score2")
+
+# Valor de resultado no introducido (los games nunca son negativos)
+NO_SCORE = -1
+
+# Máximo de games de una pareja en un partido (app, importación y API de árbitros)
+MAX_SCORE = 99
+
+
+def check_score(score):
+    """Lanza ValueError si `score` no cabe en el modelo (None = sin resultado)."""
+    if score is not None and not 0 <= score <= MAX_SCORE:
+        raise ValueError(f"El resultado debe estar entre 0 y {MAX_SCORE} games (recibido {score})")
+
+
+class TournamentModel:
+    """Jugadores internados y partidos en una matriz `int32` de forma (partidos, 8)."""
+
+    def __init__(self, players, matches, quality=None):
+        self.players = list(players)
+        self.player_ids = {p: i for i, p in enumerate(self.players)}
+        self.matches = np.asarray(matches, dtype=np.int32).reshape(-1, len(MATCH_COLUMNS))
+        # Informe del optimizador, si el fixture salió de él
+        self.quality = quality
+        rounds = self.matches[:, ROUND]
+        self.round_numbers = [int(r) for r in np.unique(rounds)]
+        self._round_index = {r: i for i, r in enumerate(self.round_numbers)}
+        # Las filas van ordenadas por ronda: la ronda i ocupa [_round_starts[i], _round_starts[i + 1])
+        self._round_starts = np.searchsorted(rounds, self.round_numbers + [self.round_numbers[-1] + 1 if self.round_numbers else 1])
+
+    @classmethod
+    def from_fixture(cls, players, fixture):
+        """Construye el modelo a partir de un fixture en formato dict (el de los generadores)."""
+        player_ids = {p: i for i, p in enumerate(players)}
+        rows = []
+        for round_data in fixture.get('rounds', []):
+            for match in round_data['matches']:
+                s1, s2 = match.get('score1'), match.get('score2')
+                rows.append((
+                    round_data['round_num'],
+                    match['court'],
+                    *(player_ids[p] for p in match['pair1'] + match['pair2']),
+                    NO_SCORE if s1 is None else s1,
+                    NO_SCORE if s2 is None else s2,
+                ))
+        rows.sort(key=lambda row: row[ROUND])
+        return cls(players, rows, quality=fixture.get('quality'))
+
+    @property
+    def num_matches(self):
+        return len(self.matches)
+
+    @property
+    def nbytes(self):
+        return self.matches.nbytes
+
+    def append_round(self, round_num, matches):
+        """Añade al final una ronda nueva sin resultados (`matches` = [(pista, a, b, c, d)]).
+
+        Las filas de las rondas anteriores no cambian, así que sus resultados,
+        la clasificación acumulada y lo ya guardado siguen siendo válidos.
+        """
+        if self.round_numbers and round_num <= self.round_numbers[-1]:
+            raise ValueError(f"La ronda {round_num} no es posterior a la última ({self.round_numbers[-1]})")
+        new_rows = np.array(
+            [(round_num, court, a, b, c, d, NO_SCORE, NO_SCORE) for court, a, b, c, d in matches],
+            dtype=np.int32
+        ).reshape(-1, len(MATCH_COLUMNS))
+        self.matches = np.concatenate([self.matches, new_rows])
+        self._round_index[round_num] = len(self.round_numbers)
+        self.round_numbers.append(round_num)
+        self._round_starts = np.append(self._round_starts, len(self.matches))
+        return self.round_rows(round_num)
+
+    def round_rows(self, round_num):
+        """Rango de filas de la matriz que pertenecen a una ronda."""
+        i = self._round_index[round_num]
+        return range(int(self._round_starts[i]), int(self._round_starts[i + 1]))
+
+    def match_row(self, round_num, match_idx):
+        return self.round_rows(round_num)[match_idx]
+
+    def match_id(self, row):
+        """Identificador `r{ronda}_m{índice}` del partido de una fila."""
+        round_num = int(self.matches[row, ROUND])
+        return f"r{round_num}_m{row - self.round_rows(round_num).start}"
+
+    def pairs(self, row):
+        """Nombres de las dos parejas de un partido."""
+        p1, p2, p3, p4 = (self.players[i] for i in self.matches[row, P1:P4 + 1])
+        return (p1, p2), (p3, p4)
+
+    def score(self, row):
+        s1, s2 = (int(s) for s in self.matches[row, SCORE1:SCORE2 + 1])
+        return (None if s1 == NO_SCORE else s1), (None if s2 == NO_SCORE else s2)
+
+    def set_score(self, row, score1, score2):
+        check_score(score1)
+        check_score(score2)
+        self.matches[row, SCORE1] = NO_SCORE if score1 is None else score1
+        self.matches[row, SCORE2] = NO_SCORE if score2 is None else score2
+
+    def set_scores(self, rows, scores):
+        """Escribe de una vez los resultados `(n, 2)` de varias filas (`NO_SCORE` = sin resultado)."""
+        self.matches[rows, SCORE1:SCORE2 + 1] = scores
+
+    def resting(self, round_num):
+        """Jugadores que descansan en una ronda (se deduce de los partidos, no se guarda)."""
+        rows = self.round_rows(round_num)
+        playing = np.zeros(len(self.players), dtype=bool)
+        playing[self.matches[rows.start:rows.stop, P1:P4 + 1].ravel()] = True
+        return [self.players[i] for i in np.flatnonzero(~playing)]
+
+    def to_fixture(self):
+        """Vista en el formato dict original, para funciones que aún lo esperan."""
+        fixture = {"rounds": []}
+        for round_num in self.round_numbers:
+            matches = []
+            for row in self.round_rows(round_num):
+                pair1, pair2 = self.pairs(row)
+                s1, s2 = self.score(row)
+                matches.append({
+                    "court": int(self.matches[row, COURT]),
+                    "pair1": pair1,
+                    "pair2": pair2,
+                    "score1": s1,
+                    "score2": s2
+                })
+            fixture["rounds"].append({
+                "round_num": round_num,
+                "matches": matches,
+                "resting": self.resting(round_num)
+            })
+        if self.quality:
+            fixture["quality"] = self.quality
+        return fixture
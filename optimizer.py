@@ -0,0 +1,330 @@
+"""Optimizador multi-arranque de fixtures.
+
+Lanza muchos arranques con semilla (rotación circular con el orden de
+jugadores permutado, o reparto aleatorio) y los mejora con búsqueda local
+(intercambios de jugadores dentro de una ronda). Los arranques se reparten
+entre un pool de procesos y se devuelve el mejor fixture encontrado dentro
+del presupuesto (un número fijo de candidatos si hay semilla, tiempo si no),
+junto con el desglose de su puntuación.
+
+Internamente un fixture es una lista de rondas; cada ronda es una lista de
+partidos `(a, b, c, d)` con índices de jugador (pareja 1 = a/b, pareja 2 = c/d)
+y la pista es la posición del partido en la ronda.
+"""
+
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from scheduling import generate_rotation_fixture
+
+# Búsqueda reproducible (con semilla): candidatos por defecto y secuencias en que se reparten
+SEEDED_CANDIDATES = 32
+SEARCH_STREAMS = 8
+
+# Peso de cada componente en la puntuación total (menor es mejor)
+SCORE_WEIGHTS = {
+    "repeated_partners": 10,
+    "repeated_opponents": 2,
+    "rest_imbalance": 5,
+    "court_imbalance": 1,
+}
+
+
+def _pair_key(a, b):
+    return (a, b) if a < b else (b, a)
+
+
+class _FixtureState:
+    """Contadores de un fixture candidato que permiten evaluar intercambios en O(pistas)."""
+
+    def __init__(self, rounds, num_players, num_courts):
+        self.rounds = rounds
+        self.num_players = num_players
+        self.num_courts = num_courts
+        self.partners = {}
+        self.opponents = {}
+        self.repeated_partners = 0
+        self.repeated_opponents = 0
+        self.games = [0] * num_players
+        self.courts = [[0] * num_courts for _ in range(num_players)]
+        self.court_imbalance = 0
+        for matches in rounds:
+            for court, match in enumerate(matches):
+                self._add_match(match, court)
+        self.court_imbalance = sum(self._player_court_imbalance(p) for p in range(num_players))
+
+    def _bump(self, counts, a, b, delta):
+        key = _pair_key(a, b)
+        before = counts.get(key, 0)
+        counts[key] = before + delta
+        # Penalización: ocurrencias por encima de la primera
+        if delta > 0:
+            return 1 if before >= 1 else 0
+        return -1 if before >= 2 else 0
+
+    def _relations(self, match, delta):
+        a, b, c, d = match
+        self.repeated_partners += self._bump(self.partners, a, b, delta)
+        self.repeated_partners += self._bump(self.partners, c, d, delta)
+        for x in (a, b):
+            for y in (c, d):
+                self.repeated_opponents += self._bump(self.opponents, x, y, delta)
+
+    def _add_match(self, match, court):
+        self._relations(match, 1)
+        for p in match:
+            self.games[p] += 1
+            self.courts[p][court] += 1
+
+    def _remove_match(self, match, court):
+        self._relations(match, -1)
+        for p in match:
+            self.games[p] -= 1
+            self.courts[p][court] -= 1
+
+    def _player_court_imbalance(self, player):
+        counts = self.courts[player]
+        return max(counts) - min(counts) if self.num_courts > 1 else 0
+
+    def rest_imbalance(self):
+        return max(self.games) - min(self.games)
+
+    def breakdown(self):
+        return {
+            "repeated_partners": self.repeated_partners,
+            "repeated_opponents": self.repeated_opponents,
+            "rest_imbalance": self.rest_imbalance(),
+            "court_imbalance": self.court_imbalance,
+        }
+
+    def total(self):
+        return weighted_score(self.breakdown())
+
+    def swap(self, round_idx, slot_i, slot_j, resting):
+        """Intercambia dos posiciones de una ronda (`slot = (pista, posición)` o `(None, idx)` si descansa)."""
+        matches = self.rounds[round_idx]
+        touched_courts = {slot[0] for slot in (slot_i, slot_j) if slot[0] is not None}
+        touched_players = set()
+        for court in touched_courts:
+            touched_players.update(matches[court])
+            self.court_imbalance -= sum(self._player_court_imbalance(p) for p in matches[court])
+            self._remove_match(matches[court], court)
+
+        def get(slot):
+            court, pos = slot
+            return resting[pos] if court is None else matches[court][pos]
+
+        def put(slot, player):
+            court, pos = slot
+            if court is None:
+                resting[pos] = player
+            else:
+                match = list(matches[court])
+                match[pos] = player
+                matches[court] = tuple(match)
+
+        x, y = get(slot_i), get(slot_j)
+        put(slot_i, y)
+        put(slot_j, x)
+
+        # Quien pasa a descansar ya tiene sus pistas descontadas; quien entra
+        # desde el descanso aún no ha restado su desequilibrio anterior.
+        now_playing = {p for court in touched_courts for p in matches[court]}
+        for p in touched_players - now_playing:
+            self.court_imbalance += self._player_court_imbalance(p)
+        for p in now_playing - touched_players:
+            self.court_imbalance -= self._player_court_imbalance(p)
+        for court in touched_courts:
+            self._add_match(matches[court], court)
+            self.court_imbalance += sum(self._player_court_imbalance(p) for p in matches[court])
+
+
+def weighted_score(breakdown):
+    """Combina el desglose de penalizaciones en una única puntuación (menor es mejor)."""
+    return sum(SCORE_WEIGHTS[name] * value for name, value in breakdown.items())
+
+
+def _rotation_candidate(rng, num_players, num_courts, num_rounds):
+    order = list(range(num_players))
+    rng.shuffle(order)
+    fixture = generate_rotation_fixture(order, num_courts, num_rounds)
+    return [[m["pair1"] + m["pair2"] for m in r["matches"]] for r in fixture["rounds"]]
+
+
+def _random_candidate(rng, num_players, num_courts, num_rounds):
+    games = [0] * num_players
+    rounds = []
+    for _ in range(num_rounds):
+        # Juegan primero quienes llevan menos partidos; el azar rompe empates
+        order = sorted(range(num_players), key=lambda p: (games[p], rng.random()))
+        playing = order[:4 * num_courts]
+        rng.shuffle(playing)
+        for p in playing:
+            games[p] += 1
+        rounds.append([tuple(playing[4 * c:4 * c + 4]) for c in range(num_courts)])
+    return rounds
+
+
+def _local_search(state, rng, steps, deadline):
+    """Búsqueda local de primera mejora con intercambios aleatorios dentro de una ronda.
+
+    El reparto de partidos es una restricción, no un término más de la
+    puntuación: un intercambio entre quien juega y quien descansa solo se
+    prueba si los partidos de ambos siguen dentro de la banda inicial
+    (`min`..`max`, que en los dos arranques difieren como mucho en uno).
+    """
+    num_courts = state.num_courts
+    restings = []
+    for matches in state.rounds:
+        playing = {p for m in matches for p in m}
+        restings.append([p for p in range(state.num_players) if p not in playing])
+    low, high = min(state.games), max(state.games)
+
+    current = state.total()
+    for step in range(steps):
+        if step % 256 == 0 and time.perf_counter() >= deadline:
+            break
+        round_idx = rng.randrange(len(state.rounds))
+        resting = restings[round_idx]
+        num_slots = 4 * num_courts + len(resting)
+        i, j = rng.randrange(num_slots), rng.randrange(num_slots)
+        slot_i = divmod(i, 4) if i < 4 * num_courts else (None, i - 4 * num_courts)
+        slot_j = divmod(j, 4) if j < 4 * num_courts else (None, j - 4 * num_courts)
+        # Intercambiar dentro de la misma pareja o entre dos que descansan no cambia nada
+        if slot_i[0] is None and slot_j[0] is None:
+            continue
+        if slot_i[0] == slot_j[0] and slot_i[1] // 2 == slot_j[1] // 2:
+            continue
+        if (slot_i[0] is None) != (slot_j[0] is None):
+            (court, pos), (_, rest_pos) = (slot_j, slot_i) if slot_i[0] is None else (slot_i, slot_j)
+            leaving, entering = state.rounds[round_idx][court][pos], resting[rest_pos]
+            if state.games[leaving] - 1 < low or state.games[entering] + 1 > high:
+                continue
+
+        state.swap(round_idx, slot_i, slot_j, resting)
+        candidate = state.total()
+        if candidate <= current:
+            current = candidate
+        else:
+            state.swap(round_idx, slot_i, slot_j, resting)
+    return current
+
+
+def _search_worker(num_players, num_courts, num_rounds, seed, time_budget, local_search_steps, max_candidates=None):
+    """Ejecuta arranques hasta agotar el presupuesto; devuelve el mejor y cuántos candidatos evaluó.
+
+    Con `max_candidates` el presupuesto es ese número de candidatos y no el
+    reloj, así que el resultado solo depende de la semilla.
+    """
+    deadline = float("inf") if max_candidates else time.perf_counter() + time_budget
+    rng = random.Random(seed)
+    best_rounds, best_score, candidates = None, None, 0
+    while True:
+        builder = _rotation_candidate if candidates % 2 == 0 else _random_candidate
+        rounds = builder(rng, num_players, num_courts, num_rounds)
+        state = _FixtureState(rounds, num_players, num_courts)
+        score = _local_search(state, rng, local_search_steps, deadline)
+        candidates += 1
+        if best_score is None or score < best_score:
+            best_rounds, best_score = [list(m) for m in state.rounds], score
+        if candidates == max_candidates or time.perf_counter() >= deadline:
+            break
+    return best_rounds, best_score, candidates
+
+
+def _rounds_to_fixture(players, rounds):
+    fixture = {"rounds": []}
+    for round_idx, matches in enumerate(rounds):
+        playing = {p for m in matches for p in m}
+        fixture["rounds"].append({
+            "round_num": round_idx + 1,
+            "matches": [
+                {
+                    "court": court + 1,
+                    "pair1": tuple(sorted((players[a], players[b]))),
+                    "pair2": tuple(sorted((players[c], players[d]))),
+                    "score1": None,
+                    "score2": None
+                }
+                for court, (a, b, c, d) in enumerate(matches)
+            ],
+            "resting": [p for idx, p in enumerate(players) if idx not in playing]
+        })
+    return fixture
+
+
+def score_fixture(fixture, players):
+    """Puntúa un fixture en formato dict (el de `generate_simplified_fixture`).
+
+    Devuelve el desglose (parejas repetidas, rivales repetidos, desequilibrio
+    de partidos jugados y de pistas) y la puntuación ponderada en `total`.
+    """
+    index = {p: i for i, p in enumerate(players)}
+    rounds = [
+        [tuple(index[p] for p in m["pair1"] + m["pair2"]) for m in r["matches"]]
+        for r in fixture.get("rounds", [])
+    ]
+    num_courts = max((len(r) for r in rounds), default=0)
+    state = _FixtureState(rounds, len(players), max(num_courts, 1))
+    breakdown = state.breakdown()
+    breakdown["total"] = weighted_score(breakdown)
+    return breakdown
+
+
+def optimize_fixture(players, num_courts, num_rounds=None, time_budget=2.0, workers=None, seed=None,
+                     local_search_steps=2000, candidates=SEEDED_CANDIDATES):
+    """Busca el mejor fixture posible y lo devuelve con su informe en `fixture["quality"]`.
+
+    Con `seed` la búsqueda es reproducible: evalúa `candidates` candidatos,
+    repartidos en `SEARCH_STREAMS` secuencias con semilla propia, y el
+    fixture solo depende de la semilla y de `candidates` (no de la máquina ni
+    de `workers`). Sin semilla se buscan candidatos durante `time_budget`
+    segundos en cada uno de los `workers` procesos (por defecto, todos los
+    núcleos), y el resultado depende de cuántos dé tiempo a evaluar.
+    """
+    players = list(players)
+    num_players = len(players)
+    actual_num_courts = min(num_courts, num_players // 4)
+    if actual_num_courts < 1:
+        return {"rounds": []}
+    if num_rounds is None:
+        num_rounds = num_players + (num_players % 2) - 1
+    workers = workers or os.cpu_count() or 1
+
+    if seed is None:
+        base_seed = random.randrange(2 ** 32)
+        args = [
+            (num_players, actual_num_courts, num_rounds, base_seed + w, time_budget, local_search_steps, None)
+            for w in range(workers)
+        ]
+    else:
+        # Las secuencias y su número de candidatos son fijos; los procesos solo las reparten
+        args = [
+            (num_players, actual_num_courts, num_rounds, seed + s, None, local_search_steps, count)
+            for s in range(SEARCH_STREAMS)
+            for count in [candidates // SEARCH_STREAMS + (s < candidates % SEARCH_STREAMS)]
+            if count
+        ]
+        workers = min(workers, len(args))
+    started = time.perf_counter()
+    if workers == 1:
+        results = [_search_worker(*a) for a in args]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_search_worker, *zip(*args)))
+    elapsed = time.perf_counter() - started
+
+    best_rounds, best_score, _ = min(results, key=lambda result: result[1])
+    candidates = sum(result[2] for result in results)
+
+    fixture = _rounds_to_fixture(players, best_rounds)
+    fixture["quality"] = {
+        "score": score_fixture(fixture, players),
+        "candidates": candidates,
+        "candidates_per_second": candidates / elapsed if elapsed > 0 else 0.0,
+        "workers": workers,
+        "elapsed": elapsed,
+    }
+    return fixture
@@ -0,0 +1,196 @@
+"""Generación estructurada de fixtures para torneos americanos.
+
+A diferencia de `generate_simplified_fixture` (aleatorio, O(N³)), aquí las
+parejas se obtienen con el método del círculo (rotación tipo Whist): cada
+ronda es un emparejamiento perfecto distinto de los jugadores, de modo que
+en N-1 rondas (N par) nadie repite compañero. Cada ronda se construye en O(N).
+
+El formato "Mexicano" no genera el fixture por adelantado: cada ronda se
+calcula al terminar la anterior a partir de la clasificación en vivo
+(`mexicano_round`), agrupando en cada pista a jugadores de posiciones
+cercanas. Construir una ronda cuesta O(N log N) y no toca las anteriores.
+"""
+
+import math
+import random
+
+
+def circle_round_pairs(num_slots, round_idx):
+    """Devuelve las parejas (índices) de la ronda `round_idx` del método del círculo.
+
+    `num_slots` debe ser par. El índice `num_slots - 1` queda fijo y el resto
+    rota, así que las `num_slots - 1` rondas forman una 1-factorización: cada
+    par de índices aparece exactamente una vez.
+    """
+    rotating = num_slots - 1
+    r = round_idx % rotating
+    pairs = [(num_slots - 1, r)]
+    for i in range(1, num_slots // 2):
+        pairs.append(((r + i) % rotating, (r - i) % rotating))
+    return pairs
+
+
+def rest_pattern(num_players, num_courts):
+    """Índices de pareja del método del círculo que descansan, para las rondas de un ciclo.
+
+    En la ronda `r` la pareja de índice `i` es la de las posiciones `r + i` y
+    `r - i` (el índice 0 es la del hueco fijo). Descansan siempre los mismos
+    índices `J`, repartidos por igual alrededor del círculo: como cada
+    posición pasa por todos los índices en `N - 1` rondas, todas descansan lo
+    mismo. Solo el jugador fijo necesita un ajuste: en las rondas de `B`
+    (una progresión de paso `j`, con `j` en `J` y primo con `N - 1`) descansa
+    la pareja 0 en lugar de la `j`, y eso quita o añade como mucho un
+    descanso a los demás. Con N impar el hueco fijo es el "bye" y la pareja 0
+    descansa siempre, sin ajuste.
+
+    Devuelve `(J, j, B)`: los descansos de cada ronda, en un ciclo de `N - 1`
+    rondas, quedan entre `L - 1` y `L` por jugador (`L` = descansos por ronda).
+    """
+    num_slots = num_players + (num_players % 2)
+    cycle = num_slots - 1
+    resting_players = num_players - 4 * min(num_courts, num_players // 4)
+    rest_indices = [cycle * k // resting_players for k in range(1, resting_players // 2 + 1)]
+    if num_players % 2 or not rest_indices:
+        return rest_indices, None, set()
+    step = next((i for i in rest_indices if math.gcd(i, cycle) == 1), None)
+    if step is None:
+        rest_indices[0] = step = 1
+    return rest_indices, step, {k * step % cycle for k in range(resting_players)}
+
+
+def generate_rotation_fixture(players, num_courts, num_rounds=None, seed=None):
+    """Genera un fixture determinista por rotación circular.
+
+    Garantiza que no se repiten compañeros mientras `num_rounds <= N-1`
+    (N redondeado a par); a partir de ahí la rotación vuelve a empezar y la
+    repetición es inevitable. Los descansos siguen `rest_pattern`: en cada
+    ciclo de N-1 rondas nadie descansa más de una vez más que otro.
+    Con `seed` se baraja antes la plantilla, de forma reproducible.
+    """
+    players = list(players)
+    if seed is not None:
+        random.Random(seed).shuffle(players)
+    num_players = len(players)
+    if num_players < 4 or num_courts < 1:
+        return {"rounds": []}
+
+    # Con N impar se añade un hueco ("bye"): quien cae con él descansa.
+    num_slots = num_players + (num_players % 2)
+    cycle = num_slots - 1
+    if num_rounds is None:
+        num_rounds = cycle
+
+    max_courts = num_players // 4
+    actual_num_courts = min(num_courts, max_courts)
+    rest_indices, step, fixed_rest_rounds = rest_pattern(num_players, actual_num_courts)
+    default_resting = set(rest_indices)
+    if num_players % 2:
+        default_resting.add(0)
+
+    fixture = {"rounds": []}
+    for round_idx in range(num_rounds):
+        # circle_round_pairs devuelve las parejas por índice: la posición i es la pareja de índice i
+        resting = default_resting
+        if round_idx % cycle in fixed_rest_rounds:
+            resting = default_resting - {step} | {0}
+        selected = [
+            pair for i, pair in enumerate(circle_round_pairs(num_slots, round_idx))
+            if i not in resting
+        ]
+
+        # Rivales: la lista de parejas gira con la ronda y se enfrentan los
+        # extremos (k contra P-1-k); las pistas también rotan con la ronda.
+        offset = round_idx % len(selected)
+        selected = selected[offset:] + selected[:offset]
+        court_offset = round_idx % actual_num_courts
+        round_matches = []
+        playing = [False] * num_players
+        for court in range(actual_num_courts):
+            k = (court - court_offset) % actual_num_courts
+            pair1 = selected[k]
+            pair2 = selected[len(selected) - 1 - k]
+            for idx in pair1 + pair2:
+                playing[idx] = True
+            round_matches.append({
+                "court": court + 1,
+                "pair1": tuple(sorted((players[pair1[0]], players[pair1[1]]))),
+                "pair2": tuple(sorted((players[pair2[0]], players[pair2[1]]))),
+                "score1": None,
+                "score2": None
+            })
+
+        fixture["rounds"].append({
+            "round_num": round_idx + 1,
+            "matches": round_matches,
+            "resting": [p for idx, p in enumerate(players) if not playing[idx]]
+        })
+
+    return fixture
+
+
+# Emparejamientos posibles de un grupo de cuatro (posiciones 0-3), en orden de preferencia
+MEXICANO_PAIRINGS = ((0, 3, 1, 2), (0, 2, 1, 3), (0, 1, 2, 3))
+
+
+def mexicano_round(ranking, games_played, num_courts, round_num, index=None):
+    """Partidos de una ronda Mexicano a partir de la clasificación actual.
+
+    `ranking` son los ids de jugador del primero al último y `games_played`
+    los partidos jugados por cada id. Si sobran jugadores descansan los que
+    más han jugado (el empate rota con `round_num`). Los que juegan se
+    agrupan de cuatro en cuatro por orden de clasificación, de la pista 1 en
+    adelante, y en cada pista juegan 1º y 4º contra 2º y 3º. Con un
+    `CooccurrenceIndex` se evita repetir compañeros: si ese reparto repite
+    pareja se prueba 1º y 3º contra 2º y 4º, y después 1º y 2º contra 3º y 4º.
+
+    Devuelve `(partidos, descansan)` con partidos `(pista, a, b, c, d)`.
+    """
+    num_players = len(ranking)
+    actual_num_courts = min(num_courts, num_players // 4)
+    num_resting = num_players - 4 * actual_num_courts
+    resting = sorted(
+        range(num_players),
+        key=lambda p: (-int(games_played[p]), (p - round_num) % num_players)
+    )[:num_resting]
+    resting_set = set(resting)
+    playing = [p for p in ranking if p not in resting_set]
+
+    matches = []
+    for court in range(actual_num_courts):
+        group = playing[4 * court:4 * court + 4]
+        pairing = MEXICANO_PAIRINGS[0]
+        if index is not None:
+            pairing = min(MEXICANO_PAIRINGS, key=lambda o: (
+                index.partner_count(group[o[0]], group[o[1]]) + index.partner_count(group[o[2]], group[o[3]])
+            ))
+        matches.append((court + 1, *(group[i] for i in pairing)))
+    return matches, resting
+
+
+def generate_mexicano_fixture(players, num_courts, num_rounds=None, seed=None):
+    """Primera ronda de un torneo Mexicano (el resto se genera ronda a ronda).
+
+    Sin clasificación todavía, el orden inicial es la plantilla barajada con
+    `seed`. `num_rounds` se ignora: las rondas siguientes salen de
+    `mexicano_round` con los resultados de la anterior.
+    """
+    players = list(players)
+    if len(players) < 4 or num_courts < 1:
+        return {"rounds": []}
+    ranking = list(range(len(players)))
+    random.Random(seed).shuffle(ranking)
+    matches, resting = mexicano_round(ranking, [0] * len(players), num_courts, 1)
+    return {"rounds": [{
+        "round_num": 1,
+        "matches": [
+            {
+                "court": court,
+                "pair1": (players[a], players[b]),
+                "pair2": (players[c], players[d]),
+                "score1": None,
+                "score2": None
+            }
+            for court, a, b, c, d in matches
+        ],
+        "resting": [players[p] for p in sorted(resting)]
+    }]}
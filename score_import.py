@@ -0,0 +1,112 @@
+"""Importación masiva de resultados.
+
+Acepta una tabla (CSV o pegada desde una hoja de cálculo) con las columnas
+ronda, pista, games de la pareja 1 y games de la pareja 2, para una ronda o
+para todo el torneo. La validación se hace de una vez sobre columnas
+completas: partidos inexistentes, valores vacíos, negativos, mayores que
+`MAX_SCORE` o no enteros y partidos repetidos. Los resultados válidos se aplican como un único lote.
+"""
+
+import io
+
+import numpy as np
+import pandas as pd
+
+from model import ROUND, COURT, MAX_SCORE
+
+# Columnas de la tabla de importación y nombres de cabecera aceptados para cada una
+IMPORT_COLUMNS = ("round", "court", "score1", "score2")
+COLUMN_ALIASES = {
+    "round": ("round", "ronda", "r"),
+    "court": ("court", "pista", "p"),
+    "score1": ("score1", "games 1", "games1", "juegos 1", "juegos1", "pareja 1", "pareja1"),
+    "score2": ("score2", "games 2", "games2", "juegos 2", "juegos2", "pareja 2", "pareja2"),
+}
+
+
+def read_score_table(text):
+    """Lee la tabla de resultados (separada por comas, punto y coma o tabuladores).
+
+    La cabecera es opcional: si la primera fila no es numérica se usa para
+    localizar las columnas por nombre; si no, se toman las cuatro primeras en
+    el orden ronda, pista, games 1, games 2. Devuelve un DataFrame de texto con
+    las columnas de `IMPORT_COLUMNS` y la línea de origen como índice.
+    """
+    lines = [line for line in text.splitlines() if line.strip()]
+    if not lines:
+        return pd.DataFrame(columns=IMPORT_COLUMNS)
+    sep = next((s for s in ("\t", ";", ",") if s in lines[0]), r"\s+")
+    raw = pd.read_csv(io.StringIO("\n".join(lines)), sep=sep, header=None, dtype=str,
+                      skipinitialspace=True, engine="python")
+    raw = raw.apply(lambda column: column.str.strip())
+
+    first_row = pd.to_numeric(raw.iloc[0], errors="coerce")
+    if first_row.isna().all():
+        header = [str(h).lower() for h in raw.iloc[0]]
+        positions = {}
+        for column, aliases in COLUMN_ALIASES.items():
+            matches = [i for i, h in enumerate(header) if h in aliases]
+            if not matches:
+                raise ValueError(f"Falta la columna '{column}' en la cabecera")
+            positions[column] = matches[0]
+        table = raw.iloc[1:, [positions[c] for c in IMPORT_COLUMNS]]
+        first_line = 2
+    else:
+        if raw.shape[1] < len(IMPORT_COLUMNS):
+            raise ValueError("Cada fila debe tener ronda, pista, games 1 y games 2")
+        table = raw.iloc[:, :len(IMPORT_COLUMNS)]
+        first_line = 1
+    table.columns = IMPORT_COLUMNS
+    table.index = pd.RangeIndex(first_line, first_line + len(table), name="line")
+    return table
+
+
+def validate_scores(model, table):
+    """Valida la tabla contra el torneo en una sola pasada vectorizada.
+
+    Devuelve `(rows, scores, errors)`: las filas de `model.matches` y los
+    resultados (n, 2) de las líneas válidas, y un DataFrame con una fila por
+    problema encontrado (línea, ronda, pista y motivo).
+    """
+    values = table[list(IMPORT_COLUMNS)].apply(pd.to_numeric, errors="coerce")
+    problems = []
+
+    def flag(mask, message):
+        mask = np.asarray(mask, dtype=bool)
+        if mask.any():
+            problems.append(pd.DataFrame({
+                "Línea": table.index[mask],
+                "Ronda": table["round"].to_numpy()[mask],
+                "Pista": table["court"].to_numpy()[mask],
+                "Error": message,
+            }))
+        return mask
+
+    ids = values[["round", "court"]]
+    missing_id = flag(ids.isna().any(axis=1), "Ronda o pista no válida")
+    fractional_id = flag((ids % 1 != 0).any(axis=1) & ~missing_id, "La ronda y la pista deben ser números enteros")
+    bad_id = missing_id | fractional_id
+    scores = values[["score1", "score2"]]
+    missing = flag(scores.isna().any(axis=1) & ~bad_id, "Falta el resultado o no es un número")
+    negative = flag((scores < 0).any(axis=1), "Resultado negativo")
+    too_high = flag((scores > MAX_SCORE).any(axis=1), f"Resultado mayor que {MAX_SCORE} games")
+    fractional = flag(((scores % 1 != 0) & scores.notna()).any(axis=1) & ~negative & ~too_high,
+                      "El resultado debe ser un número entero")
+
+    # Búsqueda de los partidos por (ronda, pista) con un índice sobre la matriz del modelo;
+    # las líneas con ronda o pista no válidas no se buscan
+    match_index = pd.MultiIndex.from_arrays([model.matches[:, ROUND], model.matches[:, COURT]])
+    lookup = pd.MultiIndex.from_arrays([
+        ids["round"].where(~bad_id, -1).astype(np.int64).to_numpy(),
+        ids["court"].where(~bad_id, -1).astype(np.int64).to_numpy(),
+    ])
+    rows = np.where(bad_id, -1, match_index.get_indexer(lookup))
+    unknown = flag((rows < 0) & ~bad_id, "No existe ese partido en el fixture")
+    found = rows >= 0
+    repeated = np.zeros(len(rows), dtype=bool)
+    repeated[found] = pd.Series(rows[found]).duplicated(keep=False).to_numpy()
+    duplicated = flag(repeated, "Partido repetido en la importación")
+
+    valid = ~(bad_id | missing | negative | too_high | fractional | unknown | duplicated)
+    errors = pd.concat(problems) if problems else pd.DataFrame(columns=["Línea", "Ronda", "Pista", "Error"])
+    return rows[valid], scores.to_numpy()[valid].astype(np.int64), errors.sort_values("Línea", kind="stable").reset_index(drop=True)
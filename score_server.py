@@ -0,0 +1,336 @@
+"""API HTTP/JSON para que los árbitros envíen resultados desde la pista.
+
+    python score_server.py --db torneos.db --port 8765
+
+Servidor asíncrono (solo biblioteca estándar: `asyncio`) sobre la misma base
+de datos SQLite que la app. Rutas:
+
+* `GET  /tournaments/{id}/matches[?round=N]`: partidos con su resultado y su `version`.
+* `GET  /tournaments/{id}/standings`: clasificación actual.
+* `POST /tournaments/{id}/scores` con `{"round", "court", "score1", "score2", "version"}`.
+
+`version` es la versión del partido que vio el árbitro (la de `GET
+/matches`). Si otro cambio llegó antes, el resultado se rechaza con 409 y la
+versión actual, y el árbitro debe revisar el partido antes de reenviarlo.
+
+Los envíos no se escriben uno a uno: una única tarea los recoge de una cola
+durante unos milisegundos y aplica cada lote en una sola transacción, con la
+comprobación de versión partido a partido, y después actualiza la
+clasificación del torneo una sola vez por lote (`StandingsAccumulator.set_scores`).
+La app de Streamlit ve los cambios consultando el contador de cambios del
+torneo en la base de datos.
+"""
+
+import argparse
+import asyncio
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+from export import standings_frame
+from model import ROUND, COURT, SCORE1, SCORE2, MAX_SCORE
+from standings import StandingsAccumulator, STAT_COLUMNS
+from storage import TournamentStore
+
+REASONS = {
+    200: "OK", 204: "No Content", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+    409: "Conflict", 413: "Payload Too Large",
+}
+ROUTE = re.compile(r"^/tournaments/(\d+)/(matches|standings|scores)/?$")
+# Un envío de resultado ocupa unas decenas de bytes: no se lee un cuerpo mayor
+MAX_BODY_BYTES = 16 * 1024
+
+
+class LiveTournament:
+    """Modelo, clasificación y versiones de un torneo en memoria, al día con la base de datos."""
+
+    def __init__(self, store, tournament_id):
+        self.store = store
+        self.tournament_id = tournament_id
+        self.reload()
+
+    def reload(self):
+        self.model = self.store.load_tournament(self.tournament_id)
+        self.engine = StandingsAccumulator(self.model)
+        rows, _, versions = self.store.changes_since(self.tournament_id, -1)
+        self.versions = np.zeros(self.model.num_matches, dtype=np.int64)
+        self.versions[rows] = versions
+        self.seen = int(self.versions.max(initial=0))
+        self.match_rows = {
+            (int(m[ROUND]), int(m[COURT])): row for row, m in enumerate(self.model.matches)
+        }
+
+    def sync(self):
+        """Aplica de una vez los cambios guardados por cualquier proceso desde la última sincronización."""
+        rows, matches, versions = self.store.changes_since(self.tournament_id, self.seen)
+        if not len(rows):
+            return
+        if rows.max() >= self.model.num_matches:
+            # Se han añadido partidos (ronda Mexicano): se recarga el torneo entero
+            self.reload()
+            return
+        self.engine.set_scores(rows, matches[:, SCORE1:SCORE2 + 1])
+        self.versions[rows] = versions
+        self.seen = int(versions.max())
+
+    def match_json(self, row):
+        pair1, pair2 = self.model.pairs(row)
+        score1, score2 = self.model.score(row)
+        return {
+            "round": int(self.model.matches[row, ROUND]),
+            "court": int(self.model.matches[row, COURT]),
+            "pair1": list(pair1),
+            "pair2": list(pair2),
+            "score1": score1,
+            "score2": score2,
+            "version": int(self.versions[row]),
+        }
+
+    def matches_json(self, round_num=None):
+        rows = range(self.model.num_matches) if round_num is None else self.model.round_rows(round_num)
+        return {"version": self.seen, "matches": [self.match_json(row) for row in rows]}
+
+    def standings_json(self):
+        df = standings_frame(self.engine.totals, self.engine.sorted_ids, self.model.players, STAT_COLUMNS)
+        return {"version": self.seen, "standings": json.loads(df.to_json(orient="records", force_ascii=False))}
+
+
+def parse_submission(body):
+    """Valida el JSON de un envío; devuelve `(ronda, pista, s1, s2, versión)` o lanza ValueError."""
+    try:
+        data = json.loads(body or b"{}")
+    except ValueError:
+        raise ValueError("El cuerpo no es JSON válido")
+    if not isinstance(data, dict):
+        raise ValueError("Se esperaba un objeto JSON")
+    values = []
+    for field in ("round", "court", "score1", "score2", "version"):
+        value = data.get(field)
+        if isinstance(value, bool) or not isinstance(value, int):
+            raise ValueError(f"'{field}' debe ser un entero")
+        if value < 0:
+            raise ValueError(f"'{field}' no puede ser negativo")
+        if field in ("score1", "score2") and value > MAX_SCORE:
+            raise ValueError(f"'{field}' no puede ser mayor que {MAX_SCORE}")
+        values.append(value)
+    return tuple(values)
+
+
+class ScoreServer:
+    """Servidor de resultados con escritura por lotes y control de versión por partido."""
+
+    def __init__(self, store, batch_interval=0.02, max_batch=500):
+        self.store = store
+        self.batch_interval = batch_interval
+        self.max_batch = max_batch
+        self.batches = 0
+        self.submissions = 0
+        self._tournaments = {}
+        self._queue = None
+        # Un único hilo para SQLite: las lecturas y los lotes se ejecutan en orden
+        self._db = ThreadPoolExecutor(max_workers=1, thread_name_prefix="score-db")
+
+    def _live(self, tournament_id):
+        live = self._tournaments.get(tournament_id)
+        if live is None:
+            live = self._tournaments[tournament_id] = LiveTournament(self.store, tournament_id)
+        else:
+            live.sync()
+        return live
+
+    async def _in_db(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._db, func, *args)
+
+    # --- Escritura por lotes ---
+
+    def _apply_batch(self, tournament_id, items):
+        """Escribe un lote de envíos de un torneo y actualiza su clasificación una vez."""
+        try:
+            live = self._live(tournament_id)
+        except KeyError:
+            return [(404, {"error": f"No existe el torneo {tournament_id}"})] * len(items)
+
+        results = [None] * len(items)
+        submissions, positions = [], []
+        for i, (round_num, court, s1, s2, expected) in enumerate(items):
+            row = live.match_rows.get((round_num, court))
+            if row is None:
+                results[i] = (404, {"error": f"No existe el partido de la ronda {round_num}, pista {court}"})
+            else:
+                submissions.append((row, s1, s2, expected))
+                positions.append(i)
+
+        outcomes = self.store.apply_submissions(tournament_id, submissions)
+        try:
+            live.sync()
+        except Exception:
+            # El torneo en memoria puede haber quedado a medias: la próxima petición lo recarga
+            del self._tournaments[tournament_id]
+            raise
+        for i, (row, *_), (accepted, _) in zip(positions, submissions, outcomes):
+            if accepted:
+                results[i] = (200, live.match_json(row))
+            else:
+                results[i] = (409, {"error": "El partido ha cambiado desde la versión enviada", "match": live.match_json(row)})
+        self.batches += 1
+        self.submissions += len(items)
+        return results
+
+    async def _batch_writer(self):
+        while True:
+            batch = [await self._queue.get()]
+            # Se agrupan los envíos que llegan durante `batch_interval`
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + self.batch_interval
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            by_tournament = {}
+            for tournament_id, submission, future in batch:
+                by_tournament.setdefault(tournament_id, []).append((submission, future))
+            for tournament_id, entries in by_tournament.items():
+                try:
+                    results = await self._in_db(self._apply_batch, tournament_id, [s for s, _ in entries])
+                except Exception as exc:
+                    results = [(500, {"error": f"{type(exc).__name__}: {exc}"})] * len(entries)
+                for (_, future), result in zip(entries, results):
+                    if not future.done():
+                        future.set_result(result)
+
+    # --- HTTP ---
+
+    async def dispatch(self, method, target, body):
+        """Resuelve una petición; devuelve `(estado, cuerpo JSON)`."""
+        url = urlsplit(target)
+        if url.path == "/health":
+            return 200, {"status": "ok", "batches": self.batches, "submissions": self.submissions}
+        match = ROUTE.match(url.path)
+        if match is None:
+            return 404, {"error": "Ruta desconocida"}
+        tournament_id, resource = int(match.group(1)), match.group(2)
+
+        if resource == "scores":
+            if method != "POST":
+                return 405, {"error": "Usa POST"}
+            try:
+                submission = parse_submission(body)
+            except ValueError as exc:
+                return 400, {"error": str(exc)}
+            future = asyncio.get_running_loop().create_future()
+            await self._queue.put((tournament_id, submission, future))
+            return await future
+
+        if method != "GET":
+            return 405, {"error": "Usa GET"}
+        try:
+            live = await self._in_db(self._live, tournament_id)
+        except KeyError:
+            return 404, {"error": f"No existe el torneo {tournament_id}"}
+        if resource == "standings":
+            return 200, await self._in_db(live.standings_json)
+        round_filter = parse_qs(url.query).get("round")
+        try:
+            round_num = int(round_filter[0]) if round_filter else None
+        except ValueError:
+            return 400, {"error": "`round` debe ser un número entero"}
+        try:
+            return 200, await self._in_db(live.matches_json, round_num)
+        except KeyError:
+            return 404, {"error": "Ronda desconocida"}
+
+    async def handle_connection(self, reader, writer):
+        """Atiende peticiones HTTP/1.1 (con keep-alive) en una conexión."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, _ = request_line.decode("latin-1").split(" ", 2)
+                except ValueError:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                keep_alive = headers.get("connection", "").lower() != "close"
+                length = headers.get("content-length") or "0"
+                if not (length.isascii() and length.isdigit()):
+                    # Sin una longitud válida no se sabe dónde acaba el cuerpo: se cierra la conexión
+                    status, payload, keep_alive = 400, {"error": "Content-Length no válido"}, False
+                elif int(length) > MAX_BODY_BYTES:
+                    status, payload, keep_alive = 413, {"error": f"El cuerpo no puede pasar de {MAX_BODY_BYTES} bytes"}, False
+                else:
+                    body = await reader.readexactly(int(length))
+                    if method == "OPTIONS":
+                        # Preflight CORS de los navegadores de los móviles
+                        status, payload = 204, None
+                    else:
+                        status, payload = await self.dispatch(method, target, body)
+                data = b"" if payload is None else json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                writer.write(
+                    f"HTTP/1.1 {status} {REASONS.get(status, 'Error')}\r\n"
+                    "Content-Type: application/json; charset=utf-8\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    "Access-Control-Allow-Origin: *\r\n"
+                    "Access-Control-Allow-Methods: GET, POST, OPTIONS\r\n"
+                    "Access-Control-Allow-Headers: Content-Type\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + data
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host="127.0.0.1", port=8765):
+        """Arranca el servidor y la tarea de escritura; devuelve el `asyncio.Server`."""
+        self._queue = asyncio.Queue()
+        self._writer_task = asyncio.create_task(self._batch_writer())
+        return await asyncio.start_server(self.handle_connection, host, port)
+
+    def close(self):
+        self._writer_task.cancel()
+        self._db.shutdown(wait=True)
+
+
+async def serve(db_path, host, port, batch_interval):
+    server = ScoreServer(TournamentStore(db_path), batch_interval=batch_interval)
+    http = await server.start(host, port)
+    print(f"API de resultados en http://{host}:{port} (base de datos: {db_path})")
+    try:
+        async with http:
+            await http.serve_forever()
+    finally:
+        server.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="API HTTP/JSON de resultados para árbitros")
+    parser.add_argument("--db", default="torneos.db", help="Base de datos SQLite de la app")
+    parser.add_argument("--host", default="127.0.0.1", help="Interfaz (0.0.0.0 para aceptar móviles de la red local)")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--batch-interval", type=float, default=0.02, help="Segundos que se agrupan envíos en un lote")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.db, args.host, args.port, args.batch_interval))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""Cálculo de la clasificación.
+
+`compute_standings` calcula los totales de todos los jugadores a partir de
+una matriz de partidos con operaciones vectorizadas (sumas por dispersión
+con `np.bincount`) y ordena con `np.lexsort`, con criterios de desempate
+configurables. Sirve para temporadas completas (miles de partidos).
+
+`StandingsAccumulator` mantiene los totales por jugador y el orden de la
+clasificación, y al cambiar el resultado de un partido solo aplica la
+diferencia: resta la aportación anterior del partido, suma la nueva y
+recoloca a los cuatro jugadores afectados con búsqueda binaria. El resultado
+es idéntico al de `calculate_standings` (mismo orden PG, DG, JG y mismo
+desempate por orden de inscripción). Un lote de resultados (importación
+masiva) se aplica con una sola actualización de totales y un solo reordenado.
+"""
+
+from bisect import bisect_left, insort
+
+import numpy as np
+
+from model import P1, P2, P3, P4, SCORE1, SCORE2, NO_SCORE
+
+# Columnas de la matriz de totales por jugador
+STAT_COLUMNS = ("JG", "JR", "DG", "PG", "PP", "PE", "PJ")
+JG, JR, DG, PG, PP, PE, PJ = range(len(STAT_COLUMNS))
+
+
+# Orden por defecto de la clasificación: 1º PG, 2º DG, 3º JG (todos descendentes)
+DEFAULT_RANKING = ("PG", "DG", "JG")
+
+
+def compute_totals(matches, num_players):
+    """Totales (jugadores, 7) en el orden de `STAT_COLUMNS` para los partidos con resultado."""
+    played = matches[(matches[:, SCORE1] != NO_SCORE) & (matches[:, SCORE2] != NO_SCORE)]
+    s1 = played[:, SCORE1].astype(np.int64)
+    s2 = played[:, SCORE2].astype(np.int64)
+    # Una entrada por jugador y partido: primero los de la pareja 1, luego los de la 2
+    ids = np.concatenate([played[:, P1], played[:, P2], played[:, P3], played[:, P4]])
+    won = np.concatenate([s1, s1, s2, s2])
+    lost = np.concatenate([s2, s2, s1, s1])
+
+    totals = np.zeros((num_players, len(STAT_COLUMNS)), dtype=np.int64)
+    totals[:, JG] = np.bincount(ids, weights=won, minlength=num_players)
+    totals[:, JR] = np.bincount(ids, weights=lost, minlength=num_players)
+    totals[:, DG] = totals[:, JG] - totals[:, JR]
+    totals[:, PG] = np.bincount(ids[won > lost], minlength=num_players)
+    totals[:, PP] = np.bincount(ids[won < lost], minlength=num_players)
+    totals[:, PE] = np.bincount(ids[won == lost], minlength=num_players)
+    totals[:, PJ] = np.bincount(ids, minlength=num_players)
+    return totals
+
+
+def _games_ratio(totals, matches, groups):
+    games = totals[:, JG] + totals[:, JR]
+    return np.divide(totals[:, JG], games, out=np.zeros(len(totals)), where=games > 0)
+
+
+def _head_to_head(totals, matches, groups):
+    """Balance de victorias (+1) y derrotas (-1) frente a cada rival empatado en los criterios anteriores."""
+    played = matches[(matches[:, SCORE1] != NO_SCORE) & (matches[:, SCORE2] != NO_SCORE)]
+    result = np.sign(played[:, SCORE1].astype(np.int64) - played[:, SCORE2])
+    points = np.zeros(len(totals), dtype=np.int64)
+    # Cada jugador de la pareja 1 se enfrenta a los dos de la pareja 2
+    for a in (P1, P2):
+        for b in (P3, P4):
+            same_group = groups[played[:, a]] == groups[played[:, b]]
+            points += np.bincount(played[same_group, a], weights=result[same_group], minlength=len(totals)).astype(np.int64)
+            points -= np.bincount(played[same_group, b], weights=result[same_group], minlength=len(totals)).astype(np.int64)
+    return points
+
+
+# Criterios de ordenación disponibles: cada uno devuelve un valor por jugador (mayor es mejor).
+# `groups` identifica a los jugadores empatados en todos los criterios anteriores.
+RANKING_CRITERIA = {
+    "PG": lambda totals, matches, groups: totals[:, PG],
+    "DG": lambda totals, matches, groups: totals[:, DG],
+    "JG": lambda totals, matches, groups: totals[:, JG],
+    "ratio_games": _games_ratio,
+    "head_to_head": _head_to_head,
+}
+
+
+def rank_players(totals, matches, criteria=DEFAULT_RANKING):
+    """Orden de la clasificación (ids de jugador) aplicando `criteria` de mayor a menor prioridad.
+
+    Los empates que persisten se resuelven por orden de inscripción, igual
+    que el `sorted(..., reverse=True)` estable de `calculate_standings`.
+    """
+    num_players = len(totals)
+    keys = []
+    groups = np.zeros(num_players, dtype=np.int64)
+    for name in criteria:
+        key = np.asarray(RANKING_CRITERIA[name](totals, matches, groups))
+        keys.append(key)
+        # Jugadores que siguen empatados tras este criterio
+        _, groups = np.unique(np.column_stack([groups, key]), axis=0, return_inverse=True)
+        groups = groups.ravel()
+    # lexsort usa la última clave como principal: se invierten y se niegan (descendente)
+    return np.lexsort([np.arange(num_players)] + [-key for key in reversed(keys)])
+
+
+def compute_standings(matches, num_players, criteria=DEFAULT_RANKING):
+    """Clasificación por lotes: devuelve `(totals, order)` para una matriz de partidos.
+
+    `matches` tiene el formato de `TournamentModel.matches`; se pueden
+    concatenar varios torneos si comparten los ids de jugador.
+    """
+    totals = compute_totals(matches, num_players)
+    return totals, rank_players(totals, matches, criteria)
+
+
+def match_id_for(round_num, match_idx):
+    """Identificador de partido usado en las claves `score1_`/`score2_` de la sesión."""
+    return f"r{round_num}_m{match_idx}"
+
+
+class StandingsAccumulator:
+    """Totales acumulados y orden de la clasificación, actualizados partido a partido.
+
+    Trabaja sobre un `TournamentModel`: los resultados se escriben en su
+    matriz de partidos y los totales se guardan en una matriz (jugadores, 7).
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.totals = compute_totals(model.matches, len(model.players))
+        # Aumenta con cada cambio efectivo de resultado (invalida las exportaciones cacheadas)
+        self.version = 0
+        self._sort()
+
+    def _sort(self):
+        # Claves ascendentes (-PG, -DG, -JG, id): equivalen al sorted(reverse=True) estable
+        self._order = sorted(self._rank_key(i) for i in range(len(self.model.players)))
+
+    def _rank_key(self, player_id):
+        pg, dg, jg = (int(v) for v in self.totals[player_id, [PG, DG, JG]])
+        return (-pg, -dg, -jg, player_id)
+
+    @property
+    def sorted_ids(self):
+        return [key[3] for key in self._order]
+
+    @property
+    def sorted_players(self):
+        return [self.model.players[key[3]] for key in self._order]
+
+    @property
+    def standings(self):
+        """Totales en el formato dict de `calculate_standings` ({jugador: {"JG": ..., ...}})."""
+        return {
+            player: dict(zip(STAT_COLUMNS, (int(v) for v in row)))
+            for player, row in zip(self.model.players, self.totals)
+        }
+
+    def _apply(self, row, s1, s2, sign):
+        ids = self.model.matches[row, P1:P4 + 1]
+        if s1 > s2:
+            outcome1, outcome2 = PG, PP
+        elif s2 > s1:
+            outcome1, outcome2 = PP, PG
+        else:
+            outcome1, outcome2 = PE, PE
+        for pair, won, lost, outcome in ((ids[:2], s1, s2, outcome1), (ids[2:], s2, s1, outcome2)):
+            self.totals[pair, JG] += sign * won
+            self.totals[pair, JR] += sign * lost
+            self.totals[pair, DG] += sign * (won - lost)
+            self.totals[pair, PJ] += sign
+            self.totals[pair, outcome] += sign
+
+    def set_score(self, row, score1, score2):
+        """Registra el resultado de la fila `row` (None si está incompleto) aplicando solo la diferencia."""
+        s1 = int(score1) if score1 is not None else None
+        s2 = int(score2) if score2 is not None else None
+        previous = self.model.score(row)
+        if previous == (s1, s2):
+            return
+        self.model.set_score(row, s1, s2)
+        self.version += 1
+        was_complete = previous[0] is not None and previous[1] is not None
+        is_complete = s1 is not None and s2 is not None
+        if not was_complete and not is_complete:
+            return
+
+        affected = [int(i) for i in self.model.matches[row, P1:P4 + 1]]
+        for p in affected:
+            del self._order[bisect_left(self._order, self._rank_key(p))]
+        if was_complete:
+            self._apply(row, previous[0], previous[1], -1)
+        if is_complete:
+            self._apply(row, s1, s2, 1)
+        for p in affected:
+            insort(self._order, self._rank_key(p))
+
+    def set_scores(self, rows, scores):
+        """Aplica un lote de resultados `(n, 2)` con una sola actualización de totales y de orden.
+
+        Se resta la aportación anterior de todas las filas del lote y se suma la
+        nueva con `compute_totals`, y la clasificación se reordena una vez.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        if not len(rows):
+            return
+        num_players = len(self.model.players)
+        self.totals -= compute_totals(self.model.matches[rows], num_players)
+        self.model.set_scores(rows, scores)
+        self.totals += compute_totals(self.model.matches[rows], num_players)
+        self.version += 1
+        self._sort()
@@ -0,0 +1,267 @@
+"""Almacenamiento persistente de torneos en SQLite.
+
+Guarda configuración, jugadores y partidos (con sus resultados) en tablas
+normalizadas, de modo que un torneo se puede reanudar por su id tras cerrar
+la pestaña o reiniciar el servidor. La base de datos trabaja en modo WAL:
+las lecturas no bloquean a la escritura y cada sesión escribe sus
+resultados en una única transacción corta por rerun.
+
+Cada torneo lleva un contador de cambios (`score_version`) que aumenta en
+cada transacción que toca resultados o añade partidos, y cada partido
+guarda el valor del contador de su último cambio (`version`). Con eso la
+API de árbitros aplica los resultados con control de concurrencia optimista
+y la app descubre los cambios de otros procesos con una consulta barata.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from model import TournamentModel, SCORE1, SCORE2, NO_SCORE, check_score
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tournaments (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    config TEXT NOT NULL,
+    quality TEXT,
+    score_version INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS players (
+    tournament_id INTEGER NOT NULL REFERENCES tournaments(id) ON DELETE CASCADE,
+    player_id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    PRIMARY KEY (tournament_id, player_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS matches (
+    tournament_id INTEGER NOT NULL REFERENCES tournaments(id) ON DELETE CASCADE,
+    row_idx INTEGER NOT NULL,
+    round_num INTEGER NOT NULL,
+    court INTEGER NOT NULL,
+    p1 INTEGER NOT NULL,
+    p2 INTEGER NOT NULL,
+    p3 INTEGER NOT NULL,
+    p4 INTEGER NOT NULL,
+    score1 INTEGER,
+    score2 INTEGER,
+    version INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (tournament_id, row_idx)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS matches_by_round ON matches (tournament_id, round_num);
+"""
+
+MATCH_FIELDS = "round_num, court, p1, p2, p3, p4, score1, score2"
+
+# Columnas añadidas después de la primera versión del esquema (bases de datos antiguas)
+MIGRATIONS = {
+    "tournaments": {"score_version": "INTEGER NOT NULL DEFAULT 0"},
+    "matches": {"version": "INTEGER NOT NULL DEFAULT 0"},
+}
+
+
+def _to_db_score(score):
+    """Resultado tal como se guarda; uno que el modelo no admite aborta (y deshace) la transacción."""
+    if score is None or score == NO_SCORE:
+        return None
+    check_score(score)
+    return int(score)
+
+
+def _rows_to_matrix(rows):
+    """Filas de la tabla `matches` (None = sin resultado) a la matriz del modelo."""
+    return np.array(
+        [[NO_SCORE if v is None else v for v in row] for row in rows],
+        dtype=np.int32
+    ).reshape(-1, 8)
+
+
+class TournamentStore:
+    """Almacén de torneos compartido por todas las sesiones (una conexión por hilo)."""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        with self._connection() as conn:
+            conn.executescript(SCHEMA)
+            for table, columns in MIGRATIONS.items():
+                existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+                for column, definition in columns.items():
+                    if column not in existing:
+                        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+        return conn
+
+    def create_tournament(self, config, model):
+        """Guarda un torneo nuevo con sus jugadores y partidos; devuelve su id."""
+        now = time.time()
+        conn = self._connection()
+        with conn:
+            cursor = conn.execute(
+                "INSERT INTO tournaments (name, config, quality, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (config.get('name', 'Torneo'), json.dumps(config),
+                 json.dumps(model.quality) if model.quality else None, now, now)
+            )
+            tournament_id = cursor.lastrowid
+            conn.executemany(
+                "INSERT INTO players (tournament_id, player_id, name) VALUES (?, ?, ?)",
+                ((tournament_id, i, name) for i, name in enumerate(model.players))
+            )
+            self._insert_matches(conn, tournament_id, model, range(model.num_matches))
+        return tournament_id
+
+    @staticmethod
+    def _insert_matches(conn, tournament_id, model, rows, version=0):
+        conn.executemany(
+            f"INSERT INTO matches (tournament_id, row_idx, {MATCH_FIELDS}, version) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                (tournament_id, row, *(int(v) for v in model.matches[row, :SCORE1]),
+                 _to_db_score(model.matches[row, SCORE1]), _to_db_score(model.matches[row, SCORE2]), version)
+                for row in rows
+            )
+        )
+
+    @staticmethod
+    def _next_version(conn, tournament_id):
+        """Aumenta el contador de cambios del torneo (dentro de la transacción en curso) y lo devuelve."""
+        conn.execute(
+            "UPDATE tournaments SET score_version = score_version + 1, updated_at = ? WHERE id = ?",
+            (time.time(), tournament_id)
+        )
+        row = conn.execute("SELECT score_version FROM tournaments WHERE id = ?", (tournament_id,)).fetchone()
+        if row is None:
+            raise KeyError(f"No existe el torneo {tournament_id}")
+        return row[0]
+
+    def append_matches(self, tournament_id, model, rows):
+        """Guarda las filas nuevas `rows` del modelo (p. ej. una ronda Mexicano recién generada)."""
+        conn = self._connection()
+        with conn:
+            version = self._next_version(conn, tournament_id)
+            self._insert_matches(conn, tournament_id, model, rows, version)
+
+    def save_scores(self, tournament_id, scores):
+        """Escribe en una sola transacción los resultados `{fila: (score1, score2)}`.
+
+        Es la escritura del operador de la app: no comprueba versiones (su
+        cambio es el último y gana) pero sí las actualiza.
+        """
+        if not scores:
+            return
+        conn = self._connection()
+        with conn:
+            version = self._next_version(conn, tournament_id)
+            conn.executemany(
+                "UPDATE matches SET score1 = ?, score2 = ?, version = ? WHERE tournament_id = ? AND row_idx = ?",
+                ((_to_db_score(s1), _to_db_score(s2), version, tournament_id, row) for row, (s1, s2) in scores.items())
+            )
+
+    def apply_submissions(self, tournament_id, submissions):
+        """Aplica en una transacción resultados con control de versión: `[(fila, s1, s2, versión esperada)]`.
+
+        Un resultado solo se escribe si el partido sigue en la versión que vio
+        quien lo envía; si no, se rechaza. Devuelve la lista de `(aceptado,
+        versión actual del partido)` en el mismo orden.
+        """
+        if not submissions:
+            return []
+        conn = self._connection()
+        outcomes = []
+        with conn:
+            version = self._next_version(conn, tournament_id)
+            for row, s1, s2, expected in submissions:
+                cursor = conn.execute(
+                    "UPDATE matches SET score1 = ?, score2 = ?, version = ? "
+                    "WHERE tournament_id = ? AND row_idx = ? AND version = ?",
+                    (_to_db_score(s1), _to_db_score(s2), version, tournament_id, row, expected)
+                )
+                if cursor.rowcount:
+                    outcomes.append((True, version))
+                else:
+                    current = conn.execute(
+                        "SELECT version FROM matches WHERE tournament_id = ? AND row_idx = ?", (tournament_id, row)
+                    ).fetchone()
+                    outcomes.append((False, current[0] if current else None))
+        return outcomes
+
+    def score_version(self, tournament_id):
+        """Contador de cambios del torneo (consulta barata para saber si hay algo nuevo)."""
+        row = self._connection().execute(
+            "SELECT score_version FROM tournaments WHERE id = ?", (tournament_id,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(f"No existe el torneo {tournament_id}")
+        return row[0]
+
+    def changes_since(self, tournament_id, version):
+        """Partidos cambiados después de `version`: `(filas, matriz de partidos, versiones)`."""
+        rows = self._connection().execute(
+            f"SELECT row_idx, version, {MATCH_FIELDS} FROM matches "
+            "WHERE tournament_id = ? AND version > ? ORDER BY row_idx",
+            (tournament_id, version)
+        ).fetchall()
+        return (
+            np.array([r[0] for r in rows], dtype=np.int64),
+            _rows_to_matrix([r[2:] for r in rows]),
+            np.array([r[1] for r in rows], dtype=np.int64),
+        )
+
+    def list_tournaments(self):
+        """Torneos guardados, del más reciente al más antiguo: `[(id, nombre, actualizado)]`."""
+        return self._connection().execute(
+            "SELECT id, name, updated_at FROM tournaments ORDER BY updated_at DESC"
+        ).fetchall()
+
+    def load_config(self, tournament_id):
+        row = self._connection().execute(
+            "SELECT config FROM tournaments WHERE id = ?", (tournament_id,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(f"No existe el torneo {tournament_id}")
+        return json.loads(row[0])
+
+    def load_tournament(self, tournament_id):
+        """Carga el torneo completo como `TournamentModel` (la clasificación necesita todos los partidos)."""
+        conn = self._connection()
+        players = [name for (name,) in conn.execute(
+            "SELECT name FROM players WHERE tournament_id = ? ORDER BY player_id", (tournament_id,)
+        )]
+        quality = conn.execute("SELECT quality FROM tournaments WHERE id = ?", (tournament_id,)).fetchone()
+        if quality is None:
+            raise KeyError(f"No existe el torneo {tournament_id}")
+        matches = _rows_to_matrix(conn.execute(
+            f"SELECT {MATCH_FIELDS} FROM matches WHERE tournament_id = ? ORDER BY row_idx", (tournament_id,)
+        ).fetchall())
+        return TournamentModel(players, matches, quality=json.loads(quality[0]) if quality[0] else None)
+
+    def delete_tournament(self, tournament_id):
+        conn = self._connection()
+        with conn:
+            conn.execute("DELETE FROM tournaments WHERE id = ?", (tournament_id,))
+
+
+class ScoreWriteBuffer:
+    """Acumula los cambios de resultado de un rerun para escribirlos en una sola transacción."""
+
+    def __init__(self):
+        self.pending = {}
+
+    def add(self, row, score1, score2):
+        self.pending[row] = (score1, score2)
+
+    def flush(self, store, tournament_id):
+        if self.pending:
+            store.save_scores(tournament_id, self.pending)
+            self.pending = {}
@@ -0,0 +1,16 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from model import TournamentModel
+from scheduling import generate_rotation_fixture
+
+
+@pytest.fixture
+def model8():
+    """Torneo de 8 jugadores (J0-J7) en 2 pistas con el fixture de rotación, sin resultados."""
+    players = [f"J{i}" for i in range(8)]
+    return TournamentModel.from_fixture(players, generate_rotation_fixture(players, 2))
@@ -0,0 +1,67 @@
+import numpy as np
+
+from cooccurrence import CooccurrenceIndex
+from model import TournamentModel
+from scheduling import generate_rotation_fixture
+
+
+def reference(model):
+    """Recuento directo, partido a partido, de lo que debe contener el índice."""
+    n = len(model.players)
+    partners, opponents = np.zeros((n, n), dtype=int), np.zeros((n, n), dtype=int)
+    games, rests = np.zeros(n, dtype=int), np.zeros(n, dtype=int)
+    for round_num in model.round_numbers:
+        playing = set()
+        for row in model.round_rows(round_num):
+            a, b, c, d = (int(i) for i in model.matches[row, 2:6])
+            for x, y in ((a, b), (c, d)):
+                partners[x, y] += 1
+                partners[y, x] += 1
+            for x in (a, b):
+                for y in (c, d):
+                    opponents[x, y] += 1
+                    opponents[y, x] += 1
+            playing.update((a, b, c, d))
+        for i in range(n):
+            games[i] += i in playing
+            rests[i] += i not in playing
+    return partners, opponents, games, rests
+
+
+def assert_matches_reference(index, model):
+    partners, opponents, games, rests = reference(model)
+    np.testing.assert_array_equal(index.partners, partners)
+    np.testing.assert_array_equal(index.opponents, opponents)
+    np.testing.assert_array_equal(index.games, games)
+    np.testing.assert_array_equal(index.rests, rests)
+    assert index.rounds == len(model.round_numbers)
+
+
+def test_sync_counts_only_new_rounds():
+    players = [f"J{i}" for i in range(10)]
+    full = TournamentModel.from_fixture(players, generate_rotation_fixture(players, 2))
+    model = TournamentModel(players, [])
+    index = CooccurrenceIndex(len(players))
+    for round_num in full.round_numbers:
+        rows = full.round_rows(round_num)
+        model.append_round(round_num, [tuple(int(v) for v in full.matches[row, 1:6]) for row in rows])
+        index.sync(model)
+        # Una segunda llamada sin rondas nuevas no cuenta nada otra vez
+        index.sync(model)
+        assert_matches_reference(index, model)
+    assert_matches_reference(CooccurrenceIndex.from_model(full), full)
+
+
+def test_sync_adds_pairs_repeated_within_one_batch():
+    players = [f"J{i}" for i in range(5)]
+    model = TournamentModel(players, [])
+    model.append_round(1, [(1, 0, 1, 2, 3)])
+    model.append_round(2, [(1, 0, 1, 2, 4)])
+    index = CooccurrenceIndex.from_model(model)
+    assert index.partner_count(0, 1) == index.partner_count(1, 0) == 2
+    assert index.opponent_count(0, 2) == 2
+    assert index.opponent_count(1, 3) == index.opponent_count(1, 4) == 1
+    # Cada ronda cuenta un descanso para quien no juega en ella
+    assert index.rests.tolist() == [0, 0, 0, 1, 1]
+    assert index.games.tolist() == [2, 2, 2, 1, 1]
+    assert index.rounds == 2
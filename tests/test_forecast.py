@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from forecast import forecast_positions
+from model import TournamentModel, NO_SCORE, SCORE1, SCORE2
+from scheduling import generate_rotation_fixture
+from standings import compute_standings
+from tournament import calculate_standings
+
+
+def scored_tournament(seed, pending_share):
+    """Torneo con marcadores bajos (muchos empates en PG, DG y JG) y una parte de partidos sin jugar."""
+    rng = np.random.default_rng(seed)
+    num_players = int(rng.integers(4, 17))
+    players = [f"J{i}" for i in range(num_players)]
+    model = TournamentModel.from_fixture(players, generate_rotation_fixture(players, num_players // 4, seed=seed))
+    scores = rng.integers(0, 4, size=(model.num_matches, 2))
+    scores[rng.random(model.num_matches) < pending_share] = NO_SCORE
+    model.set_scores(np.arange(model.num_matches), scores)
+    return players, model
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_probabilities_are_distributions_over_players_and_positions(seed):
+    players, model = scored_tournament(seed, pending_share=0.5)
+    result = forecast_positions(model.matches, len(players), simulations=2000, workers=1, seed=seed)
+    probabilities = result["probabilities"]
+    assert probabilities.shape == (len(players), len(players))
+    # Cada jugador acaba en alguna posición y cada posición la ocupa alguien
+    np.testing.assert_allclose(probabilities.sum(axis=1), 1)
+    np.testing.assert_allclose(probabilities.sum(axis=0), 1)
+    assert result["pending_matches"] == int((model.matches[:, SCORE1] == NO_SCORE).sum())
+
+
+@pytest.mark.parametrize("seed", range(30))
+def test_without_pending_matches_the_forecast_is_the_current_standings(seed):
+    players, model = scored_tournament(seed, pending_share=0)
+    result = forecast_positions(model.matches, len(players), simulations=500, workers=1, seed=seed)
+    assert result["pending_matches"] == 0
+
+    _, order = compute_standings(model.matches, len(players))
+    expected = np.zeros((len(players), len(players)))
+    expected[order, np.arange(len(players))] = 1
+    np.testing.assert_array_equal(result["probabilities"], expected)
+
+    # La clave empaquetada (PG, DG, JG) desempata igual que `calculate_standings`
+    _, sorted_players = calculate_standings(players, model)
+    assert [players[i] for i in result["probabilities"].argmax(axis=0)] == sorted_players
+
+
+def test_full_ties_keep_registration_order(model8):
+    model8.matches[:, SCORE1:SCORE2 + 1] = 3
+    result = forecast_positions(model8.matches, 8, workers=1)
+    np.testing.assert_array_equal(result["probabilities"], np.eye(8))
@@ -0,0 +1,78 @@
+import sqlite3
+
+import numpy as np
+import pytest
+
+from cooccurrence import CooccurrenceIndex
+from model import TournamentModel, P1, P4
+from scheduling import generate_mexicano_fixture, mexicano_round
+from storage import TournamentStore
+
+
+def test_groups_by_ranking_first_and_fourth_against_second_and_third():
+    ranking = [5, 2, 7, 0, 1, 6, 3, 4]
+    matches, resting = mexicano_round(ranking, [0] * 8, 2, 2)
+    assert matches == [(1, 5, 0, 2, 7), (2, 1, 4, 6, 3)]
+    assert resting == []
+
+
+@pytest.mark.parametrize("repeated, pairing", [
+    ([(0, 3)], (0, 2, 1, 3)),
+    ([(0, 3), (0, 2)], (0, 1, 2, 3)),
+    ([(0, 2)], (0, 3, 1, 2)),
+])
+def test_index_avoids_repeating_partners(repeated, pairing):
+    players = [f"J{i}" for i in range(4)]
+    model = TournamentModel(players, [])
+    for round_num, (a, b) in enumerate(repeated, start=1):
+        c, d = (p for p in range(4) if p not in (a, b))
+        model.append_round(round_num, [(1, a, b, c, d)])
+    index = CooccurrenceIndex.from_model(model)
+    matches, _ = mexicano_round([0, 1, 2, 3], index.games, 1, len(repeated) + 1, index)
+    assert matches == [(1, *pairing)]
+    # Sin índice se mantiene 1º y 4º contra 2º y 3º aunque se repita pareja
+    assert mexicano_round([0, 1, 2, 3], index.games, 1, len(repeated) + 1)[0] == [(1, 0, 3, 1, 2)]
+
+
+def test_players_with_most_games_rest():
+    matches, resting = mexicano_round([0, 1, 2, 3, 4, 5], [2, 1, 2, 1, 1, 1], 1, 3)
+    assert sorted(resting) == [0, 2]
+    assert matches == [(1, 1, 5, 3, 4)]
+    # Con los mismos partidos jugados, quién descansa rota con la ronda
+    assert sorted(mexicano_round(list(range(6)), [0] * 6, 1, 1)[1]) == [1, 2]
+    assert sorted(mexicano_round(list(range(6)), [0] * 6, 1, 2)[1]) == [2, 3]
+
+
+def test_append_round_rejects_rounds_not_after_the_last():
+    players = [f"J{i}" for i in range(8)]
+    model = TournamentModel.from_fixture(players, generate_mexicano_fixture(players, 2, seed=0))
+    before = model.matches.copy()
+    for round_num in (0, 1):
+        with pytest.raises(ValueError):
+            model.append_round(round_num, [(1, 0, 1, 2, 3)])
+    np.testing.assert_array_equal(model.matches, before)
+    assert model.round_numbers == [1]
+
+
+def test_second_session_saving_the_same_round_gets_integrity_error(tmp_path):
+    players = [f"J{i}" for i in range(8)]
+    store = TournamentStore(str(tmp_path / "torneos.db"))
+    tournament_id = store.create_tournament(
+        {"name": "Mexicano"}, TournamentModel.from_fixture(players, generate_mexicano_fixture(players, 2, seed=0))
+    )
+    sessions = [store.load_tournament(tournament_id) for _ in range(2)]
+    rankings = ([0, 1, 2, 3, 4, 5, 6, 7], [7, 6, 5, 4, 3, 2, 1, 0])
+    for model, ranking in zip(sessions, rankings):
+        matches, _ = mexicano_round(ranking, [1] * 8, 2, 2)
+        model.append_round(2, matches)
+
+    first, second = sessions
+    store.append_matches(tournament_id, first, first.round_rows(2))
+    with pytest.raises(sqlite3.IntegrityError):
+        store.append_matches(tournament_id, second, second.round_rows(2))
+
+    # Queda guardada la ronda de la primera sesión, entera
+    saved = store.load_tournament(tournament_id)
+    rows = saved.round_rows(2)
+    np.testing.assert_array_equal(saved.matches[rows.start:rows.stop, P1:P4 + 1],
+                                  first.matches[rows.start:rows.stop, P1:P4 + 1])
@@ -0,0 +1,13 @@
+import pytest
+
+from model import MAX_SCORE
+
+
+def test_set_score_rejects_out_of_range_scores(model8):
+    model = model8
+    model.set_score(0, MAX_SCORE, 0)
+    for score1, score2 in ((MAX_SCORE + 1, 0), (3, 4294967295), (-1, 2)):
+        with pytest.raises(ValueError):
+            model.set_score(1, score1, score2)
+        assert model.score(1) == (None, None)
+    assert model.score(0) == (MAX_SCORE, 0)
@@ -0,0 +1,24 @@
+import pytest
+
+from optimizer import optimize_fixture, score_fixture
+from scheduling import generate_rotation_fixture
+
+
+@pytest.mark.parametrize("num_players, num_courts", [(8, 1), (9, 2), (12, 2), (20, 4), (21, 3), (32, 4), (64, 6)])
+def test_optimizer_never_worsens_rest_balance_of_rotation(num_players, num_courts):
+    players = [f"J{i}" for i in range(num_players)]
+    rotation = score_fixture(generate_rotation_fixture(players, num_courts), players)
+    optimized = optimize_fixture(players, num_courts, time_budget=0.2, workers=1)
+    assert optimized["quality"]["score"]["rest_imbalance"] <= rotation["rest_imbalance"]
+
+
+def test_seeded_search_ignores_machine_and_workers():
+    players = [f"J{i}" for i in range(12)]
+    # Un presupuesto de tiempo ínfimo no debe recortar la búsqueda con semilla
+    runs = [
+        optimize_fixture(players, 2, seed=7, candidates=10, local_search_steps=200, time_budget=0.0, workers=workers)
+        for workers in (1, 2, 1)
+    ]
+    for fixture in runs:
+        assert fixture.pop("quality")["candidates"] == 10
+    assert runs[0] == runs[1] == runs[2]
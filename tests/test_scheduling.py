@@ -0,0 +1,38 @@
+from collections import Counter
+
+import pytest
+
+from scheduling import generate_rotation_fixture
+
+
+def rest_counts(fixture, players):
+    rests = Counter({p: 0 for p in players})
+    for round_data in fixture["rounds"]:
+        rests.update(round_data["resting"])
+    return rests
+
+
+@pytest.mark.parametrize("num_players", list(range(4, 41)) + [63, 64, 127, 128])
+def test_rotation_fixture_balances_rests_without_repeating_partners(num_players):
+    players = [f"J{i}" for i in range(num_players)]
+    for num_courts in range(1, num_players // 4 + 1):
+        fixture = generate_rotation_fixture(players, num_courts)
+        assert len(fixture["rounds"]) == num_players + num_players % 2 - 1
+
+        rests = rest_counts(fixture, players)
+        assert max(rests.values()) - min(rests.values()) <= 1, (num_players, num_courts)
+
+        partners = Counter()
+        for round_data in fixture["rounds"]:
+            assert len(round_data["matches"]) == num_courts
+            in_round = [p for m in round_data["matches"] for p in m["pair1"] + m["pair2"]]
+            assert len(set(in_round)) == len(in_round) == 4 * num_courts
+            assert set(in_round).isdisjoint(round_data["resting"])
+            partners.update(frozenset(m[key]) for m in round_data["matches"] for key in ("pair1", "pair2"))
+        assert max(partners.values()) == 1, (num_players, num_courts)
+
+
+def test_rotation_fixture_is_deterministic_per_seed():
+    players = [f"J{i}" for i in range(12)]
+    assert generate_rotation_fixture(players, 2, seed=3) == generate_rotation_fixture(players, 2, seed=3)
+    assert generate_rotation_fixture(players, 2, seed=3) != generate_rotation_fixture(players, 2, seed=4)
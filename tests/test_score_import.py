@@ -0,0 +1,37 @@
+from model import MAX_SCORE
+from score_import import read_score_table, validate_scores
+
+
+def errors_by_line(errors):
+    return {line: set(group["Error"]) for line, group in errors.groupby("Línea")}
+
+
+def test_out_of_range_and_fractional_values_are_reported_per_line(model8):
+    table = read_score_table(
+        "ronda,pista,games1,games2\n"
+        "1,1,6,3\n"
+        "1.5,1,4,6\n"
+        f"1,2,{MAX_SCORE + 1},2\n"
+        "2,1,4294967295,3\n"
+        "2,2,2.5,3\n"
+    )
+    rows, scores, errors = validate_scores(model8, table)
+    assert rows.tolist() == [0]
+    assert scores.tolist() == [[6, 3]]
+    assert errors_by_line(errors) == {
+        3: {"La ronda y la pista deben ser números enteros"},
+        4: {f"Resultado mayor que {MAX_SCORE} games"},
+        5: {f"Resultado mayor que {MAX_SCORE} games"},
+        6: {"El resultado debe ser un número entero"},
+    }
+
+
+def test_duplicates_only_count_lines_with_valid_ids(model8):
+    table = read_score_table("1,1,6,3\n1.2,1,4,6\n2,1,3,3\n2,1,5,3\n")
+    rows, _, errors = validate_scores(model8, table)
+    assert rows.tolist() == [0]
+    assert errors_by_line(errors) == {
+        2: {"La ronda y la pista deben ser números enteros"},
+        3: {"Partido repetido en la importación"},
+        4: {"Partido repetido en la importación"},
+    }
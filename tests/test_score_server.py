@@ -0,0 +1,92 @@
+import asyncio
+import json
+
+import pytest
+
+from model import MAX_SCORE
+from score_server import ScoreServer
+from storage import TournamentStore
+
+
+@pytest.fixture
+def saved(tmp_path, model8):
+    """Almacén temporal con un torneo de 8 jugadores sin resultados: `(store, tournament_id)`."""
+    store = TournamentStore(str(tmp_path / "torneos.db"))
+    return store, store.create_tournament({"name": "Test"}, model8)
+
+
+def post_scores(store, tournament_id, *payloads):
+    async def run():
+        server = ScoreServer(store, batch_interval=0.001)
+        http = await server.start("127.0.0.1", 0)
+        try:
+            return [
+                await server.dispatch("POST", f"/tournaments/{tournament_id}/scores", json.dumps(p).encode())
+                for p in payloads
+            ]
+        finally:
+            http.close()
+            server.close()
+    return asyncio.run(run())
+
+
+def test_out_of_range_score_is_rejected_before_queueing(saved):
+    store, tournament_id = saved
+    (status, body), = post_scores(store, tournament_id, {"round": 1, "court": 1, "score1": 5000000000, "score2": 3, "version": 0})
+    assert status == 400
+    assert str(MAX_SCORE) in body["error"]
+    assert store.score_version(tournament_id) == 0
+
+    (status, body), = post_scores(store, tournament_id, {"round": 1, "court": 1, "score1": MAX_SCORE, "score2": 3, "version": 0})
+    assert status == 200
+    assert (body["score1"], body["score2"]) == (MAX_SCORE, 3)
+    assert store.load_tournament(tournament_id).score(0) == (MAX_SCORE, 3)
+
+
+def test_store_rolls_back_scores_the_model_rejects(saved):
+    store, tournament_id = saved
+    with pytest.raises(ValueError):
+        store.apply_submissions(tournament_id, [(0, 6, 4, 0), (1, MAX_SCORE + 1, 0, 0)])
+    with pytest.raises(ValueError):
+        store.save_scores(tournament_id, {0: (6, 4), 1: (4294967295, 0)})
+    tournament = store.load_tournament(tournament_id)
+    assert tournament.score(0) == tournament.score(1) == (None, None)
+    assert store.score_version(tournament_id) == 0
+
+
+def raw_request(store, request):
+    """Envía `request` tal cual por un socket y devuelve `(línea de estado, cuerpo JSON)`."""
+    async def run():
+        server = ScoreServer(store, batch_interval=0.001)
+        http = await server.start("127.0.0.1", 0)
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", http.sockets[0].getsockname()[1])
+            writer.write(request)
+            response = await reader.read()
+            writer.close()
+            return response
+        finally:
+            http.close()
+            server.close()
+    head, _, body = asyncio.run(run()).partition(b"\r\n\r\n")
+    return head.split(b"\r\n")[0].decode(), json.loads(body)
+
+
+@pytest.mark.parametrize("length, status", [("abc", 400), ("-5", 400), ("²", 400), ("99999999999", 413)])
+def test_bad_content_length_is_answered_and_closes(saved, length, status):
+    store, tournament_id = saved
+    status_line, body = raw_request(
+        store, f"POST /tournaments/{tournament_id}/scores HTTP/1.1\r\nContent-Length: {length}\r\n\r\n{{}}".encode("latin-1")
+    )
+    assert status_line.startswith(f"HTTP/1.1 {status} ")
+    assert "error" in body
+    assert store.score_version(tournament_id) == 0
+
+
+def test_non_integer_round_filter_is_a_bad_request(saved):
+    store, tournament_id = saved
+    for query, status in (("round=abc", 400), ("round=99", 404), ("round=1", 200)):
+        status_line, _ = raw_request(
+            store, f"GET /tournaments/{tournament_id}/matches?{query} HTTP/1.1\r\nConnection: close\r\n\r\n".encode()
+        )
+        assert status_line.startswith(f"HTTP/1.1 {status} ")
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from model import TournamentModel, SCORE1, SCORE2, NO_SCORE
+from scheduling import generate_rotation_fixture
+from standings import StandingsAccumulator, STAT_COLUMNS, compute_standings
+from tournament import calculate_standings
+
+
+def random_tournament(seed):
+    """Torneo con resultados aleatorios: marcadores bajos para provocar empates en PG, DG y JG."""
+    rng = np.random.default_rng(seed)
+    num_players = int(rng.integers(4, 25))
+    num_courts = int(rng.integers(1, num_players // 4 + 1))
+    players = [f"J{i}" for i in range(num_players)]
+    model = TournamentModel.from_fixture(players, generate_rotation_fixture(players, num_courts, seed=seed))
+    scores = rng.integers(0, 4, size=(model.num_matches, 2))
+    # Algunos partidos quedan sin jugar o con un solo resultado
+    scores[rng.random(model.num_matches) < 0.2] = NO_SCORE
+    scores[rng.random(model.num_matches) < 0.05, 1] = NO_SCORE
+    return players, model, scores, rng
+
+
+def reference(players, model):
+    standings, sorted_players = calculate_standings(players, model)
+    totals = np.array([[standings[p][c] for c in STAT_COLUMNS] for p in players])
+    return totals, [players.index(p) for p in sorted_players]
+
+
+@pytest.mark.parametrize("seed", range(60))
+def test_standings_implementations_agree(seed):
+    players, model, scores, rng = random_tournament(seed)
+    model.set_scores(np.arange(model.num_matches), scores)
+    expected_totals, expected_order = reference(players, model)
+
+    totals, order = compute_standings(model.matches, len(players))
+    np.testing.assert_array_equal(totals, expected_totals)
+    assert order.tolist() == expected_order
+
+    # Acumulador partido a partido, con resultados intermedios que se corrigen después
+    empty_model = TournamentModel(players, model.matches.copy())
+    empty_model.matches[:, SCORE1:SCORE2 + 1] = NO_SCORE
+    incremental = StandingsAccumulator(empty_model)
+    for row in rng.permutation(model.num_matches):
+        incremental.set_score(int(row), int(rng.integers(0, 4)), int(rng.integers(0, 4)))
+    for row in rng.permutation(model.num_matches):
+        s1, s2 = model.score(int(row))
+        incremental.set_score(int(row), s1, s2)
+    np.testing.assert_array_equal(incremental.totals, expected_totals)
+    assert incremental.sorted_ids == expected_order
+
+    # Acumulador por lotes (importación masiva) sobre un torneo ya empezado
+    batch_model = TournamentModel(players, model.matches.copy())
+    batch_model.matches[::2, SCORE1:SCORE2 + 1] = 0
+    batch = StandingsAccumulator(batch_model)
+    rows = np.arange(0, model.num_matches, 2)
+    batch.set_scores(rows, model.matches[rows, SCORE1:SCORE2 + 1])
+    np.testing.assert_array_equal(batch.totals, expected_totals)
+    assert batch.sorted_ids == expected_order
+
+
+def test_ties_fall_back_to_registration_order(model8):
+    model, players = model8, model8.players
+    # Todos empatan: mismo PG, DG y JG para todos los jugadores
+    model.set_scores(np.arange(model.num_matches), np.full((model.num_matches, 2), 3))
+    _, expected_order = reference(players, model)
+    assert expected_order == list(range(8))
+    assert compute_standings(model.matches, 8)[1].tolist() == expected_order
+    assert StandingsAccumulator(model).sorted_ids == expected_order
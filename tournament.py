@@ -0,0 +1,224 @@
+"""Lógica pura del torneo americano, sin dependencia de Streamlit.
+
+Generador aleatorio simplificado, cálculo completo de la clasificación y
+exportación en texto. La usan tanto la app (code.py) como la CLI por lotes
+(cli.py) y los benchmarks.
+"""
+
+import random
+from itertools import combinations
+
+from standings import match_id_for
+
+
+def generate_simplified_fixture(players, num_courts, num_rounds=None, seed=None):
+    """Genera un fixture SIMPLIFICADO. No garantiza rotación perfecta.
+
+    Con la misma `seed` (y plantilla) el fixture es siempre el mismo.
+    """
+    num_players = len(players)
+    if num_players < 4:
+        return {"rounds": []} # No se puede jugar con menos de 4
+
+    # Número de rondas tentativo (N-1 es para Round Robin completo, adaptamos)
+    # Para un americano, puede ser menos, depende de cuánto tiempo se tenga.
+    # Usemos una heurística: suficientes rondas para que la gente juegue varias veces.
+    # Podríamos hacerlo configurable, pero empecemos con N/2 o N-1
+    # num_rounds = max(1, num_players // 2) # Ejemplo: jugar aprox la mitad de rondas posibles
+    if num_rounds is None:
+        num_rounds = max(1, num_players - 1) # Más cercano al americano completo
+    rng = random.Random(seed) # Generador propio: no depende del estado global de `random`
+
+    fixture = {"rounds": []}
+    all_players = list(players) # Copia para manipular
+
+    # --- Lógica de generación de rondas (Simplificada) ---
+    # Esta parte sigue siendo compleja para garantizar justicia y no repetición.
+    # Usaremos una aleatorización fuerte en cada ronda como aproximación.
+    
+    # Historial para minimizar repetición de parejas (simple)
+    played_pairs = set() 
+    
+    for round_num in range(1, num_rounds + 1):
+        round_matches = []
+        players_this_round = list(all_players)
+        rng.shuffle(players_this_round)
+        
+        players_assigned_this_round = set()
+        # Ajuste: Asegurar que num_courts no sea mayor que partidos posibles
+        max_matches_possible = len(players_this_round) // 4
+        actual_num_courts = min(num_courts, max_matches_possible)
+        
+        if actual_num_courts <= 0: # Si no hay suficientes jugadores para un partido
+            continue # Saltar esta iteración de ronda
+
+        possible_pairs = list(combinations(players_this_round, 2))
+        rng.shuffle(possible_pairs)
+
+        # Intentar formar parejas que no hayan jugado juntas recientemente
+        potential_pairs = []
+        players_already_paired = set()
+        for p1, p2 in possible_pairs:
+            pair_tuple = tuple(sorted((p1, p2)))
+            priority = 1 if pair_tuple not in played_pairs else 0 
+            if p1 not in players_already_paired and p2 not in players_already_paired:
+                 potential_pairs.append( (priority, pair_tuple) )
+
+        potential_pairs.sort(key=lambda x: x[0], reverse=True) 
+        
+        final_round_pairs = []
+        players_in_final_pairs = set()
+        for _, pair_tuple in potential_pairs:
+            p1, p2 = pair_tuple
+            if p1 not in players_in_final_pairs and p2 not in players_in_final_pairs:
+                final_round_pairs.append(pair_tuple)
+                players_in_final_pairs.add(p1)
+                players_in_final_pairs.add(p2)
+
+        # --- Enfrentar Parejas ---
+        match_count = 0
+        assigned_players_in_match = set()
+        available_pairs_for_match = list(final_round_pairs) 
+        rng.shuffle(available_pairs_for_match)
+
+        while match_count < actual_num_courts and len(available_pairs_for_match) >= 2:
+            pair1 = available_pairs_for_match.pop(0)
+            
+            found_opponent = False
+            for i in range(len(available_pairs_for_match)):
+                pair2 = available_pairs_for_match[i]
+                if not set(pair1) & set(pair2): 
+                    available_pairs_for_match.pop(i) 
+                    
+                    played_pairs.add(pair1)
+                    played_pairs.add(pair2)
+
+                    round_matches.append({
+                        "court": match_count + 1,
+                        "pair1": pair1,
+                        "pair2": pair2,
+                        "score1": None,
+                        "score2": None
+                    })
+                    assigned_players_in_match.update(pair1)
+                    assigned_players_in_match.update(pair2)
+                    match_count += 1
+                    found_opponent = True
+                    break 
+
+            if not found_opponent:
+                # No se encontró oponente, devolver pair1 si es necesario (poco probable aquí)
+                 pass
+
+        players_resting = [p for p in all_players if p not in assigned_players_in_match]
+
+        if round_matches:
+             fixture["rounds"].append({
+                 "round_num": len(fixture["rounds"]) + 1, 
+                 "matches": round_matches,
+                 "resting": players_resting
+             })
+
+    return fixture
+
+def calculate_standings(players, tournament, scores=None):
+    """Calcula la clasificación basada en los resultados introducidos en el fixture (TournamentModel).
+
+    Si se pasa `scores` (un mapping con claves `score1_{match_id}`/`score2_{match_id}`,
+    p. ej. `st.session_state`), los resultados se leen de ahí y se copian al
+    modelo; si no, se usan los que ya tiene el modelo.
+    """
+    # Reiniciar standings a cero antes de recalcular
+    standings = {
+        player: {"JG": 0, "JR": 0, "DG": 0, "PG": 0, "PP": 0, "PE": 0, "PJ": 0}
+        for player in players
+    }
+
+    if tournament is None:
+        return standings, [] 
+
+    # Recalcular todo desde los scores actuales
+    processed_matches_for_player_stats = {p: set() for p in players} # Para evitar doble conteo de PJ/PG/PP/PE
+
+    for round_num in tournament.round_numbers:
+        for match_idx, row in enumerate(tournament.round_rows(round_num)):
+            match_id = match_id_for(round_num, match_idx) # Identificador único del partido
+            
+            score1_key = f"score1_{match_id}"
+            score2_key = f"score2_{match_id}"
+
+            if scores is not None:
+                score1 = scores.get(score1_key) # Puede ser None o 0
+                score2 = scores.get(score2_key)
+            else:
+                score1, score2 = tournament.score(row)
+
+            # Convertir a int si no es None, manejar 0 como válido
+            s1 = int(score1) if score1 is not None else None
+            s2 = int(score2) if score2 is not None else None
+
+            # Actualizar el modelo del torneo (aunque ya leemos de él)
+            tournament.set_score(row, s1, s2)
+
+            if s1 is not None and s2 is not None:
+                pair1, pair2 = tournament.pairs(row)
+
+                # Actualizar Games Ganados/Recibidos (siempre se suman)
+                for p in pair1:
+                    standings[p]['JG'] += s1
+                    standings[p]['JR'] += s2
+                for p in pair2:
+                    standings[p]['JG'] += s2
+                    standings[p]['JR'] += s1
+
+                # Actualizar PJ/PG/PP/PE (solo una vez por partido por jugador)
+                if s1 > s2: # Gana Pareja 1
+                    outcome1, outcome2 = 'PG', 'PP'
+                elif s2 > s1: # Gana Pareja 2
+                    outcome1, outcome2 = 'PP', 'PG'
+                else: # Empate
+                    outcome1, outcome2 = 'PE', 'PE'
+
+                for p in pair1:
+                    if match_id not in processed_matches_for_player_stats[p]:
+                        standings[p]['PJ'] += 1
+                        standings[p][outcome1] += 1
+                        processed_matches_for_player_stats[p].add(match_id)
+                for p in pair2:
+                     if match_id not in processed_matches_for_player_stats[p]:
+                        standings[p]['PJ'] += 1
+                        standings[p][outcome2] += 1
+                        processed_matches_for_player_stats[p].add(match_id)
+
+
+    # Calcular Diferencia de Games al final
+    for player in players:
+        standings[player]['DG'] = standings[player]['JG'] - standings[player]['JR']
+
+    # Ordenar: 1º PG (desc), 2º DG (desc), 3º JG (desc)
+    sorted_players = sorted(
+        players,
+        key=lambda p: (standings[p]['PG'], standings[p]['DG'], standings[p]['JG']),
+        reverse=True
+    )
+
+    return standings, sorted_players
+
+def iter_standings_text(standings, sorted_players, tournament_name):
+    """Genera el texto de la clasificación línea a línea (para escribirlo por trozos)."""
+    separator = "-" * 75 + "\n"
+    yield f"--- CLASIFICACIÓN: {tournament_name} ---\n"
+    yield separator
+    yield f"{'Pos':<4} {'Jugador':<20} {'PJ':<4} {'PG':<4} {'PE':<4} {'PP':<4} {'JG':<6} {'JR':<6} {'DG':<6}\n"
+    yield separator
+
+    for i, player in enumerate(sorted_players):
+        stats = standings[player]
+        yield f"{i+1:<4} {player:<20} {stats['PJ']:<4} {stats['PG']:<4} {stats['PE']:<4} {stats['PP']:<4} {stats['JG']:<6} {stats['JR']:<6} {stats['DG']:<6}\n"
+
+    yield separator
+
+
+def generate_standings_text(standings, sorted_players, tournament_name):
+    """Genera el texto formateado para la clasificación."""
+    return "".join(iter_standings_text(standings, sorted_players, tournament_name))